@@ -3,11 +3,9 @@ import type { Note } from './note';
 export type Month = {
     month: number;
     notes: Note[];
-    isCollapsed: boolean;
   };
 
 export type Year = {
     year: number;
     months: Month[];
-    isCollapsed: boolean;
-};
\ No newline at end of file
+};
@@ -1,4 +1,5 @@
 export type filterSelect = {
     name : string,
-    selected : boolean
+    selected : boolean,
+    count? : number
 };
\ No newline at end of file
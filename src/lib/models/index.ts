@@ -1,3 +1,4 @@
 export type { Note } from './note';
 export type { Year, Month } from './dateHierarchy';
-export type { filterSelect } from './filterSelect';
\ No newline at end of file
+export type { filterSelect } from './filterSelect';
+export type { Keyword, NoteStreamChunk } from './noteStream';
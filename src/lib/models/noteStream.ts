@@ -0,0 +1,14 @@
+import type { Note } from './note';
+
+export type Keyword = { Id: string; Name: string; CompositionId: string };
+
+/**
+ * Rader i NDJSON-svaret från /api. Först kommer listan med anteckningar utan
+ * CaseData, sedan en rad per anteckning allt eftersom detaljerna hämtas.
+ */
+export type NoteStreamChunk =
+  | { type: 'list'; ehrId: string; notes: Note[]; keywords: Keyword[]; caseNoteFilter: any[] }
+  | { type: 'note'; CompositionId: string; CaseData: string; error?: string; errorStatus?: number }
+  | { type: 'skip'; CompositionId: string }
+  | { type: 'error'; error: string }
+  | { type: 'done' };
@@ -0,0 +1,17 @@
+import * as dotenv from 'dotenv';
+dotenv.config();
+
+const readPositiveInt = (value: string | undefined, fallback: number): number => {
+  const parsed = Number.parseInt(value ?? '', 10);
+  return Number.isFinite(parsed) && parsed > 0 ? parsed : fallback;
+};
+
+export const API_USER = process.env.API_USER as string;
+export const API_PASS = process.env.API_PASS as string;
+
+// Max number of RSK.View.CaseNote requests in flight per /api call
+export const DETAIL_CONCURRENCY = readPositiveInt(process.env.API_DETAIL_CONCURRENCY, 8);
+// Upper bound for a single upstream request, including reading the body
+export const REQUEST_TIMEOUT_MS = readPositiveInt(process.env.API_REQUEST_TIMEOUT_MS, 10000);
+// Memory bound for cached EHR view responses
+export const CACHE_MAX_BYTES = readPositiveInt(process.env.API_CACHE_MAX_BYTES, 64 * 1024 * 1024);
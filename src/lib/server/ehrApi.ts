@@ -0,0 +1,137 @@
+import { API_PASS, API_USER, DETAIL_CONCURRENCY, REQUEST_TIMEOUT_MS } from './config';
+import { cachedFetch, type EhrView } from './viewCache';
+
+export { DETAIL_CONCURRENCY, REQUEST_TIMEOUT_MS };
+
+const BASE_URL = 'https://open-platform-migration.service.tietoevry.com/ehr/rest/v1/view/';
+
+export const styleError = 'color: red; font-style: italic;';
+export const styleNotFound = 'text-indent:10px; margin-bottom:10px;';
+
+export const createBasicAuth = (username: string, password: string): string =>
+  'Basic ' + btoa(`${username}:${password}`);
+
+export const getAuthHeader = (): string =>
+  createBasicAuth(API_USER, API_PASS);
+
+export const getViewUrl = (ehrId: string, view: EhrView, compId?: string): string =>
+  `${BASE_URL}${ehrId}/${view}${compId ? `?compId=${encodeURIComponent(compId)}` : ''}`;
+
+/**
+ * GET mot EHR-plattformen med timeout. Node:s inbyggda fetch delar en
+ * keep-alive-pool mellan anropen, så uppkopplingar återanvänds.
+ */
+export function fetchEhr(
+  url: string,
+  authHeader: string,
+  timeoutMs: number = REQUEST_TIMEOUT_MS,
+  headers: Record<string, string> = {}
+): Promise<Response> {
+  return fetch(url, {
+    method: 'GET',
+    headers: { ...headers, Authorization: authHeader },
+    signal: AbortSignal.timeout(timeoutMs),
+  });
+}
+
+/**
+ * Hämtar en vy för en patient via den delade svarscachen.
+ */
+export function fetchView(ehrId: string, view: EhrView, authHeader: string, compId?: string): Promise<Response> {
+  return cachedFetch({ ehrId, view, compId }, (headers) =>
+    fetchEhr(getViewUrl(ehrId, view, compId), authHeader, REQUEST_TIMEOUT_MS, headers)
+  );
+}
+
+/**
+ * Kör worker för varje element med högst limit samtidiga anrop.
+ * Resultaten returneras i samma ordning som items.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  worker: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results = new Array<R>(items.length);
+  let next = 0;
+
+  const run = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await worker(items[index], index);
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(Math.max(limit, 1), items.length) }, run));
+  return results;
+}
+
+/**
+ * Anteckningen som den skickas innan CaseData har hämtats. Anteckningar utan
+ * compositionId kan aldrig hämtas och får felmeddelandet direkt.
+ */
+export function toListNote(ehrId: string, note: any): any {
+  if (!note.CompositionId) {
+    return {
+      ...note,
+      CaseData: `<div style="${styleError}">Missing compositionId for EHR ID: ${ehrId}</div>`,
+      error: 'Missing compositionId',
+    };
+  }
+  return { ...note, CaseData: '' };
+}
+
+/**
+ * Om anteckningen har sparats efter since (jämförs mot
+ * Tidsstämpel_för_sparat_dokument). Anteckningar vars tid inte går att
+ * tolka räknas som nya, så att de hellre hämtas en gång för mycket.
+ */
+export function savedAfter(note: any, since: number): boolean {
+  const saved = Date.parse(note.Tidsstämpel_för_sparat_dokument);
+  return Number.isNaN(saved) || saved > since;
+}
+
+/**
+ * Hämtar CaseData för en anteckning. Returnerar null om anteckningen ska
+ * hoppas över (servern svarade 500), annars anteckningen med CaseData eller
+ * ett felmeddelande.
+ */
+export async function fetchCaseNoteDetail(ehrId: string, note: any, authHeader: string): Promise<any | null> {
+  const compositionId = note.CompositionId;
+
+  if (!compositionId) {
+    return toListNote(ehrId, note);
+  }
+
+  try {
+    const detailRes = await fetchView(ehrId, 'RSK.View.CaseNote', authHeader, compositionId);
+
+    if (!detailRes.ok) {
+      if (detailRes.status === 500) {
+        // Skip this note entirely on server error
+        return null;
+      }
+
+      const errorText = `Failed to fetch detail for Composition ID: ${compositionId} - ${detailRes.status} ${detailRes.statusText}`;
+      return {
+        ...note,
+        CaseData: `<div style="${styleError}">${errorText}</div>`,
+        error: errorText,
+        errorStatus: detailRes.status,
+      };
+    }
+
+    const detailData = await detailRes.json();
+    const caseData = detailData[0]?.CaseData ?? `<div style="${styleNotFound}">Case data not found</div>`;
+    return { ...note, CaseData: caseData };
+
+  } catch (e) {
+    const errorMessage = e instanceof Error ? e.message : String(e);
+    const errorText = `Error fetching detail for Composition ID: ${compositionId} - ${errorMessage}`;
+    return {
+      ...note,
+      CaseData: `<div style="${styleError}">${errorText}</div>`,
+      error: errorText,
+    };
+  }
+}
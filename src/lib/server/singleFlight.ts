@@ -0,0 +1,19 @@
+const inFlight = new Map<string, Promise<unknown>>();
+
+/**
+ * Kör fn en gång per nyckel åt gången. Anrop med samma nyckel medan fn
+ * pågår får samma promise i stället för att starta en egen hämtning.
+ * @param key 
+ * @param fn 
+ * @returns 
+ */
+export function singleFlight<T>(key: string, fn: () => Promise<T>): { promise: Promise<T>; shared: boolean } {
+  const existing = inFlight.get(key) as Promise<T> | undefined;
+  if (existing) {
+    return { promise: existing, shared: true };
+  }
+
+  const promise = fn().finally(() => inFlight.delete(key));
+  inFlight.set(key, promise);
+  return { promise, shared: false };
+}
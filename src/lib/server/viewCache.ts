@@ -0,0 +1,165 @@
+import { CACHE_MAX_BYTES } from './config';
+import { singleFlight } from './singleFlight';
+
+export type EhrView =
+  | 'RSK.View.CaseNoteList'
+  | 'RSK.View.Keywords'
+  | 'RSK.View.CaseNoteFilter'
+  | 'RSK.View.CaseNote';
+
+export type ViewCacheKey = { ehrId: string; view: EhrView; compId?: string };
+
+// Saved case notes don't change, while the list grows as new notes are written
+const VIEW_TTL_MS: Record<EhrView, number> = {
+  'RSK.View.CaseNoteList': 60 * 1000,
+  'RSK.View.Keywords': 5 * 60 * 1000,
+  'RSK.View.CaseNoteFilter': 5 * 60 * 1000,
+  'RSK.View.CaseNote': 24 * 60 * 60 * 1000,
+};
+
+// What a request for one key resolved to, shared by every caller waiting on it
+type Snapshot = {
+  status: number;
+  statusText: string;
+  body: string;
+  contentType: string;
+};
+
+type CacheEntry = {
+  body: string;
+  contentType: string;
+  etag: string | null;
+  lastModified: string | null;
+  expiresAt: number;
+  size: number;
+};
+
+export type ViewCacheStats = {
+  hits: number;
+  misses: number;
+  coalesced: number;
+  revalidated: number;
+  evictions: number;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+};
+
+// Map iteration order doubles as LRU order: least recently used first
+const entries = new Map<string, CacheEntry>();
+let totalBytes = 0;
+const counters = { hits: 0, misses: 0, coalesced: 0, revalidated: 0, evictions: 0 };
+
+const toCacheKey = ({ ehrId, view, compId }: ViewCacheKey): string =>
+  `${ehrId}|${view}|${compId ?? ''}`;
+
+function touch(key: string, entry: CacheEntry) {
+  entries.delete(key);
+  entries.set(key, entry);
+}
+
+function remove(key: string) {
+  const entry = entries.get(key);
+  if (!entry) return;
+  entries.delete(key);
+  totalBytes -= entry.size;
+}
+
+function store(key: string, entry: CacheEntry) {
+  remove(key);
+  if (entry.size > CACHE_MAX_BYTES) return;
+
+  entries.set(key, entry);
+  totalBytes += entry.size;
+
+  for (const oldestKey of entries.keys()) {
+    if (totalBytes <= CACHE_MAX_BYTES) break;
+    remove(oldestKey);
+    counters.evictions++;
+  }
+}
+
+const NULL_BODY_STATUSES = new Set([204, 205, 304]);
+
+const toResponse = ({ status, statusText, body, contentType }: Snapshot): Response =>
+  new Response(NULL_BODY_STATUSES.has(status) ? null : body, {
+    status,
+    statusText,
+    headers: { 'Content-Type': contentType },
+  });
+
+const fromEntry = (entry: CacheEntry): Snapshot =>
+  ({ status: 200, statusText: 'OK', body: entry.body, contentType: entry.contentType });
+
+async function loadSnapshot(
+  key: string,
+  cacheKey: ViewCacheKey,
+  fetcher: (headers: Record<string, string>) => Promise<Response>
+): Promise<Snapshot> {
+  const cached = entries.get(key);
+
+  const conditionalHeaders: Record<string, string> = {};
+  if (cached?.etag) conditionalHeaders['If-None-Match'] = cached.etag;
+  if (cached?.lastModified) conditionalHeaders['If-Modified-Since'] = cached.lastModified;
+
+  const res = await fetcher(conditionalHeaders);
+
+  if (cached && res.status === 304) {
+    counters.revalidated++;
+    cached.expiresAt = Date.now() + VIEW_TTL_MS[cacheKey.view];
+    store(key, cached);
+    return fromEntry(cached);
+  }
+
+  counters.misses++;
+  const body = NULL_BODY_STATUSES.has(res.status) ? '' : await res.text();
+  const contentType = res.headers.get('content-type') ?? 'application/json';
+
+  if (!res.ok) {
+    remove(key);
+    return { status: res.status, statusText: res.statusText, body, contentType };
+  }
+
+  const entry: CacheEntry = {
+    body,
+    contentType,
+    etag: res.headers.get('etag'),
+    lastModified: res.headers.get('last-modified'),
+    expiresAt: Date.now() + VIEW_TTL_MS[cacheKey.view],
+    size: Buffer.byteLength(body),
+  };
+  store(key, entry);
+  return fromEntry(entry);
+}
+
+/**
+ * Hämtar en vy via cachen. Färska svar serveras från minnet, utgångna svar
+ * omvalideras med If-None-Match/If-Modified-Since när uppströms skickat
+ * ETag/Last-Modified. Samtidiga anrop för samma nyckel delar på en enda
+ * hämtning. Endast lyckade svar cachas.
+ * @param cacheKey (ehrId, vy, compId)
+ * @param fetcher gör själva anropet med eventuella villkorliga headers
+ * @returns 
+ */
+export async function cachedFetch(
+  cacheKey: ViewCacheKey,
+  fetcher: (headers: Record<string, string>) => Promise<Response>
+): Promise<Response> {
+  const key = toCacheKey(cacheKey);
+  const cached = entries.get(key);
+
+  if (cached && cached.expiresAt > Date.now()) {
+    counters.hits++;
+    touch(key, cached);
+    return toResponse(fromEntry(cached));
+  }
+
+  const { promise, shared } = singleFlight(key, () => loadSnapshot(key, cacheKey, fetcher));
+  if (shared) counters.coalesced++;
+
+  return toResponse(await promise);
+}
+
+export function getViewCacheStats(): ViewCacheStats {
+  return { ...counters, entries: entries.size, bytes: totalBytes, maxBytes: CACHE_MAX_BYTES };
+}
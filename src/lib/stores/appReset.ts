@@ -0,0 +1,50 @@
+import { get } from 'svelte/store';
+import type { Keyword, Note } from '$lib/models';
+import { allNotes, filteredNotes, selectedNotes, filter, CaseNoteFilter } from './storedNotes';
+import { powerMode, showTimeline, resetOpenDocs, destructMode } from './activeFeatures';
+import { allKeywords, selectedKeywords, searchQuery, textSearchQuery } from './searchStore';
+import { clearNoteCache } from './noteCache';
+
+// State that lives in components rather than stores, e.g. the filter choices in Header
+const resetters = new Set<() => void>();
+
+/**
+ * Registrerar hur en komponent återställer sitt eget tillstånd när appen återställs.
+ * @param reset
+ * @returns avregistrerar igen, ges till onDestroy
+ */
+export function onAppReset(reset: () => void): () => void {
+  resetters.add(reset);
+  return () => {
+    resetters.delete(reset);
+  };
+}
+
+/**
+ * Återställer appen till läget direkt efter att en journal lästs in, utan
+ * att ladda om sidan. Används av testerna för att återanvända en sida.
+ * @param journal läses in i stället för den nuvarande journalen, om den anges
+ */
+export function resetApp(journal?: { notes: Note[]; keywords: Keyword[]; caseNoteFilter: any[] }) {
+  // Stops saving first, so a replacement journal is never written over the cached one
+  clearNoteCache();
+
+  if (journal) {
+    allNotes.set(journal.notes);
+    allKeywords.set(journal.keywords);
+    CaseNoteFilter.set(journal.caseNoteFilter);
+  }
+
+  selectedNotes.set([]);
+  filteredNotes.set(get(allNotes));
+  filter.set(new Map());
+  selectedKeywords.set(new Set());
+  searchQuery.set('');
+  textSearchQuery.set('');
+  powerMode.set(false);
+  showTimeline.set(false);
+  destructMode.set(false);
+  resetOpenDocs.set(false);
+
+  for (const reset of resetters) reset();
+}
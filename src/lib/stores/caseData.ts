@@ -0,0 +1,118 @@
+import { get } from 'svelte/store';
+import type { Note } from '$lib/models/note';
+import { allNotes, currentEhrId, selectedNotes } from './storedNotes';
+
+const styleError = 'color: red; font-style: italic;';
+
+// Number of list neighbours on each side whose bodies are fetched ahead of time
+const PREFETCH_RADIUS = 2;
+
+/** errorStatus är HTTP-statusen som gav felet, den saknas vid nätverksfel och timeouts */
+export type NoteDetail = { CompositionId: string; CaseData: string; error?: string; errorStatus?: number };
+
+const inFlight = new Map<string, Promise<void>>();
+
+// Bodies the /api stream is still going to deliver, so they are not fetched separately
+let streamed = new Set<string>();
+
+/**
+ * Sätter in hämtad CaseData i allNotes och i de kopior som redan ligger i
+ * selectedNotes. Anteckningar i skipped tas bort.
+ */
+export function applyNoteDetails(details: Map<string, NoteDetail>, skipped: Set<string> = new Set()) {
+  if (details.size === 0 && skipped.size === 0) return;
+
+  for (const compositionId of details.keys()) streamed.delete(compositionId);
+  for (const compositionId of skipped) streamed.delete(compositionId);
+
+  const patch = (notes: Note[]) =>
+    notes
+      .filter((note) => !skipped.has(note.CompositionId))
+      .map((note) => {
+        const detail = details.get(note.CompositionId);
+        return detail ? { ...note, ...detail } : note;
+      });
+
+  allNotes.update(patch);
+  selectedNotes.update(patch);
+}
+
+async function fetchNoteDetail(compositionId: string): Promise<NoteDetail> {
+  try {
+    const ehrId = get(currentEhrId);
+    const query = ehrId ? `?ehrId=${encodeURIComponent(ehrId)}` : '';
+    const res = await fetch(`/api/note/${encodeURIComponent(compositionId)}${query}`);
+    const body = await res.json();
+
+    if (!res.ok) {
+      const errorText = body?.error ?? `Failed to fetch detail for Composition ID: ${compositionId} - ${res.status}`;
+      return {
+        CompositionId: compositionId,
+        CaseData: `<div style="${styleError}">${errorText}</div>`,
+        error: errorText,
+        errorStatus: res.status,
+      };
+    }
+    return {
+      CompositionId: compositionId,
+      CaseData: body.CaseData,
+      ...(body.error ? { error: body.error, errorStatus: body.errorStatus } : {}),
+    };
+  } catch (e: unknown) {
+    const errorMessage = e instanceof Error ? e.message : String(e);
+    const errorText = `Error fetching detail for Composition ID: ${compositionId} - ${errorMessage}`;
+    return { CompositionId: compositionId, CaseData: `<div style="${styleError}">${errorText}</div>`, error: errorText };
+  }
+}
+
+/**
+ * Markerar att CaseData för anteckningarna kommer via strömmen från /api, så
+ * att ensureCaseData inte hämtar dem en gång till medan strömmen pågår.
+ * @param compositionIds 
+ */
+export function expectStreamedDetails(compositionIds: Iterable<string>) {
+  streamed = new Set(compositionIds);
+}
+
+/**
+ * Anropas när strömmen från /api är slut. Anteckningar som den aldrig
+ * levererade hämtas därefter på begäran, de öppnade direkt.
+ */
+export function endStreamedDetails() {
+  if (streamed.size === 0) return;
+  streamed = new Set();
+  ensureCaseData(get(selectedNotes));
+}
+
+/**
+ * Hämtar CaseData för de anteckningar som saknar den. Pågående hämtningar
+ * återanvänds så att samma anteckning bara hämtas en gång, och anteckningar
+ * som strömmen från /api ännu inte har levererat hämtas inte alls.
+ * @param notes 
+ * @returns 
+ */
+export function ensureCaseData(notes: Note[]): Promise<void> {
+  const pending: Promise<void>[] = [];
+
+  for (const note of notes) {
+    if (!note?.CompositionId || note.CaseData !== '' || streamed.has(note.CompositionId)) continue;
+
+    let request = inFlight.get(note.CompositionId);
+    if (!request) {
+      request = fetchNoteDetail(note.CompositionId)
+        .then((detail) => applyNoteDetails(new Map([[detail.CompositionId, detail]])))
+        .finally(() => inFlight.delete(note.CompositionId));
+      inFlight.set(note.CompositionId, request);
+    }
+    pending.push(request);
+  }
+
+  return Promise.all(pending).then(() => undefined);
+}
+
+/**
+ * Förhämtar CaseData för anteckningarna runt index i en lista.
+ */
+export function prefetchNeighbours(notes: Note[], index: number, radius: number = PREFETCH_RADIUS) {
+  return ensureCaseData(notes.slice(Math.max(0, index - radius), index + radius + 1));
+}
@@ -0,0 +1,60 @@
+import { derived, get, readable } from 'svelte/store';
+import type { Keyword, Note } from '$lib/models';
+import { allNotes } from './storedNotes';
+import { allKeywords } from './searchStore';
+import { setReady } from './readiness';
+import { applyKeywordDelta, createKeywordIndex, type KeywordIndex } from '$lib/utils/keywordIndex';
+import { createDataEngine, type DataEngine } from '$lib/workers/dataEngine';
+import type { FilterQuery, FilterResult } from '$lib/workers/engine';
+
+const index = createKeywordIndex();
+let publish: ((index: KeywordIndex) => void) | null = null;
+let engine: DataEngine | null = null;
+// Syncs sent to the engine whose keyword changes have not come back yet
+let pendingSyncs = 0;
+
+// Started on first use, so nothing runs during server rendering
+function getDataEngine(): DataEngine {
+  engine ??= createDataEngine((delta) => {
+    applyKeywordDelta(index, delta);
+    publish?.(index);
+    pendingSyncs--;
+    if (pendingSyncs === 0) setReady('keywords', true);
+  });
+  return engine;
+}
+
+function syncEngine(notes: Note[], keywords: Keyword[]) {
+  if (getDataEngine().update(notes, keywords)) {
+    pendingSyncs++;
+    setReady('keywords', false);
+  }
+}
+
+const notesAndKeywords = derived([allNotes, allKeywords], (values) => values);
+
+/**
+ * Sökord -> anteckningar och anteckning -> sökord. CaseData parsas i
+ * datamotorn och bara ändringarna skickas hit, så huvudtråden håller en
+ * kopia av indexet utan att själv läsa någon HTML.
+ */
+export const keywordIndex = readable<KeywordIndex>(index, (set) => {
+  publish = set;
+  const unsubscribe = notesAndKeywords.subscribe(([$allNotes, $allKeywords]) => syncEngine($allNotes, $allKeywords));
+  return () => {
+    publish = null;
+    unsubscribe();
+  };
+});
+
+/**
+ * Filtrerar notes i datamotorn. Motorn får först de ändringar i notes som
+ * den inte har sett, så positionerna i svaret gäller just notes.
+ * @param notes 
+ * @param query 
+ * @returns 
+ */
+export function filterNotes(notes: Note[], query: FilterQuery): Promise<FilterResult> {
+  syncEngine(notes, get(allKeywords));
+  return getDataEngine().filter(query);
+}
@@ -1,3 +1,8 @@
-export {allNotes, filteredNotes, selectedNotes, filter, CaseNoteFilter} from './storedNotes';
+export {allNotes, filteredNotes, selectedNotes, selectedIds, filter, CaseNoteFilter, currentEhrId} from './storedNotes';
 export { powerMode, resetOpenDocs, showTimeline, destructMode } from './activeFeatures';
-export { allKeywords, selectedKeywords } from './searchStore'
+export { allKeywords, selectedKeywords, searchQuery, debouncedSearchQuery, textSearchQuery, debouncedTextSearchQuery } from './searchStore'
+export { applyNoteDetails, ensureCaseData, prefetchNeighbours, expectStreamedDetails, endStreamedDetails } from './caseData';
+export { keywordIndex, filterNotes } from './dataEngine';
+export { noteKeywords } from './noteKeywords';
+export { readiness, setReady } from './readiness';
+export { resetApp, onAppReset } from './appReset';
@@ -0,0 +1,278 @@
+import { get } from 'svelte/store';
+import type { Keyword, Note } from '$lib/models';
+import { allNotes, CaseNoteFilter } from './storedNotes';
+import { allKeywords } from './searchStore';
+
+const DB_NAME = 'claritycare';
+const DB_VERSION = 1;
+const JOURNALS = 'journals';
+const NOTES = 'notes';
+
+// Writes are batched so a streamed journal is saved a few times, not once per note
+const SAVE_DELAY_MS = 1000;
+// Patient data is not kept on the device for longer than this after the journal was last synced
+const MAX_AGE_MS = 12 * 60 * 60 * 1000;
+
+/** En patients journal som den sparas lokalt */
+export type CachedJournal = {
+  ehrId: string;
+  notes: Note[];
+  keywords: Keyword[];
+  caseNoteFilter: any[];
+};
+
+// The list order and the views are stored once per patient, each note on its own so it can be written alone
+type JournalRecord = { ehrId: string; order: string[]; keywords: Keyword[]; caseNoteFilter: any[]; savedAt: number };
+// Notes that could not be fetched carry the error, and the HTTP status when there was one
+type FailedNote = Note & { error?: string; errorStatus?: number };
+type NoteRecord = FailedNote & { ehrId: string };
+
+let database: Promise<IDBDatabase> | null = null;
+// All writes go through one chain, so clearing the cache cannot race a save
+let saving = Promise.resolve();
+
+function openDatabase(): Promise<IDBDatabase> {
+  database ??= new Promise<IDBDatabase>((resolve, reject) => {
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () => {
+      const db = request.result;
+      db.createObjectStore(JOURNALS, { keyPath: 'ehrId' });
+      db.createObjectStore(NOTES, { keyPath: ['ehrId', 'CompositionId'] }).createIndex('ehrId', 'ehrId');
+    };
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  }).catch((e) => {
+    database = null;
+    throw e;
+  });
+  return database;
+}
+
+function requestResult<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transactionDone(transaction: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+  });
+}
+
+function logError(message: string) {
+  return (e: unknown) => console.error(message, e instanceof Error ? e.message : String(e));
+}
+
+// Notes are keyed by [ehrId, CompositionId], so one patient's notes are a single key range
+function patientNotes(ehrId: string): IDBKeyRange {
+  return IDBKeyRange.bound([ehrId], [ehrId, []]);
+}
+
+/**
+ * Tar bort de sparade journalerna för alla patienter utom keep.
+ * @param keep
+ */
+async function deleteJournals(keep?: string) {
+  const db = await openDatabase();
+  const transaction = db.transaction([JOURNALS, NOTES], 'readwrite');
+  const journals = transaction.objectStore(JOURNALS);
+  const notes = transaction.objectStore(NOTES);
+
+  if (keep === undefined) {
+    journals.clear();
+    notes.clear();
+  } else {
+    const ehrIds = await requestResult(journals.getAllKeys());
+    for (const ehrId of ehrIds) {
+      if (ehrId === keep) continue;
+      journals.delete(ehrId);
+      notes.delete(patientNotes(ehrId as string));
+    }
+  }
+  await transactionDone(transaction);
+}
+
+/**
+ * Läser en patients sparade journal från IndexedDB. En journal som inte har
+ * synkats på MAX_AGE_MS tas bort i stället för att visas.
+ * @param ehrId
+ * @returns null om inget finns sparat eller IndexedDB inte går att använda
+ */
+export async function loadCachedJournal(ehrId: string): Promise<CachedJournal | null> {
+  if (typeof indexedDB === 'undefined') return null;
+
+  try {
+    const db = await openDatabase();
+    const transaction = db.transaction([JOURNALS, NOTES], 'readonly');
+    const [journal, records] = await Promise.all([
+      requestResult<JournalRecord | undefined>(transaction.objectStore(JOURNALS).get(ehrId)),
+      requestResult<NoteRecord[]>(transaction.objectStore(NOTES).index('ehrId').getAll(ehrId)),
+    ]);
+    if (!journal) return null;
+    if (!(Date.now() - journal.savedAt <= MAX_AGE_MS)) {
+      // Journals saved before savedAt existed count as expired too. Other patients were removed when this one was saved
+      await clearNoteCache();
+      return null;
+    }
+
+    const byId = new Map<string, Note>();
+    for (const { ehrId: _, ...note } of records) byId.set(note.CompositionId, note);
+    const notes = journal.order.map((id) => byId.get(id)).filter((note): note is Note => note !== undefined);
+
+    return { ehrId, notes, keywords: journal.keywords, caseNoteFilter: journal.caseNoteFilter };
+  } catch (e: unknown) {
+    logError('Error reading cached journal:')(e);
+    return null;
+  }
+}
+
+/**
+ * Om anteckningens fel inte går över av att hämta den igen, dvs. EHR-plattformen
+ * svarade med ett 4xx-fel (utom 408 och 429). Nätverksfel, timeouts och
+ * 5xx-fel räknas som tillfälliga.
+ * @param note
+ * @returns
+ */
+export function hasPermanentError(note: Note): boolean {
+  const { error, errorStatus } = note as FailedNote;
+  return (
+    error !== undefined &&
+    errorStatus !== undefined &&
+    errorStatus >= 400 &&
+    errorStatus < 500 &&
+    errorStatus !== 408 &&
+    errorStatus !== 429
+  );
+}
+
+function savedTime(note: Note): number {
+  return Date.parse(note.Tidsstämpel_för_sparat_dokument);
+}
+
+/**
+ * Senaste Tidsstämpel_för_sparat_dokument i journalen, för att bara hämta
+ * det som sparats efter den. Bara om alla anteckningar har sin CaseData,
+ * annars skulle äldre anteckningar som saknas aldrig hämtas. Anteckningar
+ * med ett bestående fel räknas inte, de skulle inte gå att hämta ändå.
+ * @param journal
+ * @returns undefined när hela journalen behöver hämtas
+ */
+export function cachedUntil(journal: CachedJournal): string | undefined {
+  let latest: Note | undefined;
+  for (const note of journal.notes) {
+    if (hasPermanentError(note)) continue;
+    if (note.CaseData === '' || Number.isNaN(savedTime(note))) return undefined;
+    if (!latest || savedTime(note) > savedTime(latest)) latest = note;
+  }
+  return latest?.Tidsstämpel_för_sparat_dokument;
+}
+
+/**
+ * Anteckningarna i listan från servern, med CaseData från den sparade
+ * journalen för de anteckningar som inte har sparats om sedan dess.
+ * @param notes
+ * @param journal
+ * @returns
+ */
+export function mergeCachedNotes(notes: Note[], journal: CachedJournal | null): Note[] {
+  if (!journal) return notes;
+
+  const cached = new Map(journal.notes.map((note) => [note.CompositionId, note]));
+  return notes.map((note) => {
+    const previous = cached.get(note.CompositionId);
+    const unchanged =
+      previous !== undefined &&
+      previous.CaseData !== '' &&
+      previous.Tidsstämpel_för_sparat_dokument === note.Tidsstämpel_för_sparat_dokument;
+    return unchanged ? previous : note;
+  });
+}
+
+// A permanent error is kept with its message, so the note does not hold back the since sync.
+// Other errors are shown in place of a body but should be fetched again next time
+function toRecord(ehrId: string, note: Note): NoteRecord {
+  if (hasPermanentError(note)) return { ...note, ehrId };
+  const { error, errorStatus, ...rest } = note as FailedNote;
+  return { ...rest, CaseData: error ? '' : rest.CaseData, ehrId };
+}
+
+let stopPersisting: (() => void) | null = null;
+
+/**
+ * Sparar allNotes, allKeywords och CaseNoteFilter för ehrId i IndexedDB när
+ * de ändras. Bara anteckningar som ändrats sedan förra sparningen skrivs.
+ * Bara en patient sparas åt gången, journaler för andra patienter tas bort.
+ * @param ehrId
+ * @param stored anteckningarna som redan finns sparade, t.ex. från loadCachedJournal
+ */
+export function persistJournal(ehrId: string, stored: Note[] = []) {
+  stopPersisting?.();
+  if (typeof indexedDB === 'undefined') return;
+
+  let written = new Map(stored.map((note) => [note.CompositionId, note]));
+  let writtenOrder = stored.map((note) => note.CompositionId).join('\n');
+  let writtenKeywords: Keyword[] | null = null;
+  let writtenFilter: any[] | null = null;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+
+  saving = saving.then(() => deleteJournals(ehrId)).catch(logError('Error removing cached journals:'));
+
+  async function save() {
+    // Notes without a CompositionId have no key in NOTES and only hold an error, the list brings them back anyway
+    const notes = get(allNotes).filter((note) => note.CompositionId);
+    const keywords = get(allKeywords) as Keyword[];
+    const caseNoteFilter = get(CaseNoteFilter);
+
+    const changed = notes.filter((note) => written.get(note.CompositionId) !== note);
+    const current = new Set(notes.map((note) => note.CompositionId));
+    const removed = Array.from(written.keys()).filter((id) => !current.has(id));
+    const order = notes.map((note) => note.CompositionId);
+    const orderKey = order.join('\n');
+    const journalChanged = orderKey !== writtenOrder || keywords !== writtenKeywords || caseNoteFilter !== writtenFilter;
+    if (changed.length === 0 && removed.length === 0 && !journalChanged) return;
+
+    const db = await openDatabase();
+    const transaction = db.transaction([JOURNALS, NOTES], 'readwrite');
+    const noteStore = transaction.objectStore(NOTES);
+    for (const note of changed) noteStore.put(toRecord(ehrId, note));
+    for (const id of removed) noteStore.delete([ehrId, id]);
+    // Written on every save, so savedAt tells when the journal was last synced
+    transaction.objectStore(JOURNALS).put({ ehrId, order, keywords, caseNoteFilter, savedAt: Date.now() } satisfies JournalRecord);
+    await transactionDone(transaction);
+
+    written = new Map(notes.map((note) => [note.CompositionId, note]));
+    writtenOrder = orderKey;
+    writtenKeywords = keywords;
+    writtenFilter = caseNoteFilter;
+  }
+
+  function schedule() {
+    clearTimeout(timer);
+    timer = setTimeout(() => {
+      saving = saving.then(save).catch(logError('Error caching journal:'));
+    }, SAVE_DELAY_MS);
+  }
+
+  const unsubscribers = [allNotes.subscribe(schedule), allKeywords.subscribe(schedule), CaseNoteFilter.subscribe(schedule)];
+  stopPersisting = () => {
+    clearTimeout(timer);
+    unsubscribers.forEach((unsubscribe) => unsubscribe());
+    stopPersisting = null;
+  };
+}
+
+/**
+ * Slutar spara och tar bort alla sparade journaler. Anropas när appen
+ * återställs.
+ */
+export function clearNoteCache(): Promise<void> {
+  stopPersisting?.();
+  if (typeof indexedDB === 'undefined') return saving;
+
+  saving = saving.then(() => deleteJournals()).catch(logError('Error clearing cached journals:'));
+  return saving;
+}
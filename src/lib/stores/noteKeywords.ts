@@ -0,0 +1,23 @@
+import { derived } from 'svelte/store';
+import { keywordIndex } from './dataEngine';
+import { selectedKeywords } from './searchStore';
+import { matchNoteKeywords } from '$lib/utils/keywordIndex';
+
+let current = new Map<string, readonly string[]>();
+
+/**
+ * CompositionId -> de valda sökord som finns i anteckningen. Listorna delas
+ * mellan uppdateringar så länge de inte ändrats, och storen meddelar bara
+ * prenumeranter när någon anteckning faktiskt fått andra sökord.
+ */
+export const noteKeywords = derived(
+  [keywordIndex, selectedKeywords],
+  ([$keywordIndex, $selectedKeywords], set) => {
+    const next = matchNoteKeywords($keywordIndex, $selectedKeywords, current);
+    if (next !== current) {
+      current = next;
+      set(current);
+    }
+  },
+  current
+);
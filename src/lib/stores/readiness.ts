@@ -0,0 +1,24 @@
+import { get, writable, type Readable } from 'svelte/store';
+
+/**
+ * Vad appen är klar med. data: journalen är inläst (eller misslyckades),
+ * filtered: listan visar svaret på de aktuella filtren, keywords:
+ * sökordsindexet motsvarar anteckningarna, timeline: tidslinjen är
+ * utritad för sin aktuella vy.
+ */
+export type ReadySignal = 'data' | 'filtered' | 'keywords' | 'timeline';
+
+const signals = writable<ReadonlySet<ReadySignal>>(new Set());
+
+/** Signalerna som är klara just nu. Visas som data-ready på <main> så att tester kan vänta på dem */
+export const readiness: Readable<ReadonlySet<ReadySignal>> = { subscribe: signals.subscribe };
+
+export function setReady(signal: ReadySignal, ready: boolean) {
+  const current = get(signals);
+  if (current.has(signal) === ready) return;
+
+  const next = new Set(current);
+  if (ready) next.add(signal);
+  else next.delete(signal);
+  signals.set(next);
+}
@@ -1,5 +1,32 @@
-import { writable } from 'svelte/store';
+import { derived, writable, type Readable } from 'svelte/store';
 
 export const searchQuery = writable('');
 export const allKeywords = writable<{ Id: string; Name: string; CompositionId: string }[]>([]);
-export const selectedKeywords = writable<Set<string>>(new Set<string>());
\ No newline at end of file
+export const selectedKeywords = writable<Set<string>>(new Set<string>());
+
+/** Fritextsökning över alla anteckningar */
+export const textSearchQuery = writable('');
+
+const SEARCH_DEBOUNCE_MS = 150;
+
+/**
+ * Värdet i query, men uppdateras först när användaren slutat skriva en stund.
+ * En tömd sökning slår igenom direkt.
+ */
+function debounced(query: Readable<string>): Readable<string> {
+  return derived(
+    query,
+    ($query, set) => {
+      if ($query === '') {
+        set('');
+        return;
+      }
+      const timer = setTimeout(() => set($query), SEARCH_DEBOUNCE_MS);
+      return () => clearTimeout(timer);
+    },
+    ''
+  );
+}
+
+export const debouncedSearchQuery = debounced(searchQuery);
+export const debouncedTextSearchQuery = debounced(textSearchQuery);
@@ -1,8 +1,12 @@
-import { writable } from 'svelte/store';
+import { derived, writable } from 'svelte/store';
 import type { Note } from '$lib/models/note';
 
 export const filteredNotes = writable<Note[]>([]);
 export const allNotes = writable<Note[]>([]);
 export const selectedNotes = writable<Note[]>([]);
+/** CompositionId för de öppnade anteckningarna, så att det går att slå upp om en anteckning är vald utan att leta i listan */
+export const selectedIds = derived(selectedNotes, ($selectedNotes) => new Set($selectedNotes.map((note) => note.CompositionId)));
 export const filter = writable<Map<string, Set<string>>>(new Map<string, Set<string>>());
-export const CaseNoteFilter = writable<any[]>([]);
\ No newline at end of file
+export const CaseNoteFilter = writable<any[]>([]);
+// Patient whose journal is loaded, empty means the server's default patient
+export const currentEhrId = writable<string>('');
\ No newline at end of file
@@ -0,0 +1,55 @@
+/**
+ * Enkla bitmängder över anteckningarnas positioner, en bit per anteckning.
+ */
+export type Bitset = Uint32Array;
+
+export function createBitset(size: number, filled: boolean = false): Bitset {
+    const bits = new Uint32Array((size + 31) >>> 5);
+    if (filled && size > 0) {
+        bits.fill(0xffffffff);
+        const rest = size & 31;
+        if (rest !== 0) bits[bits.length - 1] = (1 << rest) - 1;
+    }
+    return bits;
+}
+
+export function setBit(bits: Bitset, position: number) {
+    bits[position >>> 5] |= 1 << (position & 31);
+}
+
+/** target &= other */
+export function andInto(target: Bitset, other: Bitset): Bitset {
+    for (let i = 0; i < target.length; i++) target[i] &= other[i];
+    return target;
+}
+
+/** target |= other */
+export function orInto(target: Bitset, other: Bitset): Bitset {
+    for (let i = 0; i < target.length; i++) target[i] |= other[i];
+    return target;
+}
+
+function popcount(word: number): number {
+    word -= (word >>> 1) & 0x55555555;
+    word = (word & 0x33333333) + ((word >>> 2) & 0x33333333);
+    return (((word + (word >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+/** Antal bitar som är satta i både a och b, utan att skapa en ny mängd. */
+export function countAnd(a: Bitset, b: Bitset): number {
+    let count = 0;
+    for (let i = 0; i < a.length; i++) count += popcount(a[i] & b[i]);
+    return count;
+}
+
+/** Anropar fn för varje satt bit i stigande ordning. */
+export function forEachBit(bits: Bitset, fn: (position: number) => void) {
+    for (let i = 0; i < bits.length; i++) {
+        let word = bits[i];
+        while (word !== 0) {
+            const lowest = word & -word;
+            fn((i << 5) + 31 - Math.clz32(lowest));
+            word ^= lowest;
+        }
+    }
+}
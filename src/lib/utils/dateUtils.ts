@@ -0,0 +1,24 @@
+import type { Note } from '$lib/models';
+
+// DateTime strings repeat across re-fetched note objects, so the parsed value is cached per string
+const timestamps = new Map<string, number>();
+// Room for a couple of the largest journals. When it is full the cache starts over, so switching
+// between journals cannot grow it without bound
+const MAX_CACHED_TIMESTAMPS = 250_000;
+
+/**
+ * Anteckningens tidpunkt i millisekunder. Varje DateTime-sträng tolkas bara
+ * en gång, så länge cachen inte har fyllts.
+ * @param note 
+ * @returns 
+ */
+export function getTimestamp(note: Note): number {
+    let time = timestamps.get(note.DateTime);
+    if (time === undefined) {
+        time = new Date(note.DateTime).getTime();
+        if (Number.isNaN(time)) time = 0;
+        if (timestamps.size >= MAX_CACHED_TIMESTAMPS) timestamps.clear();
+        timestamps.set(note.DateTime, time);
+    }
+    return time;
+}
@@ -1 +1,28 @@
-export const ehrIds: String[] = ['d5da0dca-e915-4e55-bc0c-02e06eb0a92b'];
\ No newline at end of file
+export const DEFAULT_EHR_ID = '2b8d6cc8-0e30-439f-aeaa-0b0edfa09127';
+
+export const ehrIds: string[] = [DEFAULT_EHR_ID, 'd5da0dca-e915-4e55-bc0c-02e06eb0a92b'];
+
+const UUID = '[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}';
+const EHR_ID_PATTERN = new RegExp(`^${UUID}$`, 'i');
+// openEHR version uid: <uuid>::<system id>::<version>, or just the uuid
+const COMPOSITION_ID_PATTERN = new RegExp(`^${UUID}(::[A-Za-z0-9.-]+::[0-9]+)?$`, 'i');
+
+/**
+ * Kontrollerar att ett ehrId ser ut som ett UUID innan det används i en URL
+ * mot EHR-plattformen.
+ * @param ehrId 
+ * @returns 
+ */
+export function isValidEhrId(ehrId: string): boolean {
+    return EHR_ID_PATTERN.test(ehrId);
+}
+
+/**
+ * Kontrollerar att ett compositionId ser ut som ett openEHR-id innan det
+ * används i en URL mot EHR-plattformen.
+ * @param compositionId 
+ * @returns 
+ */
+export function isValidCompositionId(compositionId: string): boolean {
+    return COMPOSITION_ID_PATTERN.test(compositionId);
+}
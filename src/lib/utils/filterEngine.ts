@@ -0,0 +1,241 @@
+import type { Note } from '$lib/models';
+import { andInto, countAnd, createBitset, orInto, setBit, type Bitset } from './bitset';
+
+export type FacetName = 'Journalmall' | 'Vårdenhet' | 'Yrkesroll';
+
+/** Vilket fält i anteckningen varje filter tittar på */
+export const FACET_FIELDS: Record<FacetName, keyof Note> = {
+    Journalmall: 'Dokumentnamn',
+    Vårdenhet: 'Vårdenhet_Namn',
+    Yrkesroll: 'Dokument_skapad_av_yrkestitel_Namn',
+};
+
+export const FACET_NAMES = Object.keys(FACET_FIELDS) as FacetName[];
+
+export type FilterIndex = {
+    notes: Note[];
+    /** CompositionId -> position i notes */
+    positions: Map<string, number>;
+    /** Filter -> värde -> bitmängd med anteckningarna som har värdet */
+    facets: Map<FacetName, Map<string, Bitset>>;
+    /** Datum (ÅÅÅÅ-MM-DD) stigande, och anteckningens position för varje datum */
+    dates: string[];
+    datePositions: Int32Array;
+};
+
+export type FilterState = {
+    facets: Map<FacetName, Set<string>>;
+    minDate: string;
+    maxDate: string;
+    /** Begränsa till dessa anteckningar, t.ex. de som har valda sökord. null = ingen begränsning */
+    compositionIds: Set<string> | null;
+};
+
+function sameNotes(index: FilterIndex, notes: Note[]): boolean {
+    if (index.notes.length !== notes.length) return false;
+    for (let i = 0; i < notes.length; i++) {
+        const previous = index.notes[i];
+        if (previous !== notes[i] && (previous.CompositionId !== notes[i].CompositionId || previous.DateTime !== notes[i].DateTime)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+/**
+ * Bygger inverterade index per filter och en sorterad datumlista. Om notes
+ * innehåller samma anteckningar som förra indexet (t.ex. när bara CaseData
+ * har fyllts i) återanvänds indexet.
+ * @param notes 
+ * @param previous 
+ * @returns 
+ */
+export function buildFilterIndex(notes: Note[], previous: FilterIndex | null = null): FilterIndex {
+    if (previous && sameNotes(previous, notes)) {
+        return { ...previous, notes };
+    }
+
+    const positions = new Map<string, number>();
+    const facets = new Map<FacetName, Map<string, Bitset>>(FACET_NAMES.map((name) => [name, new Map()]));
+
+    notes.forEach((note, position) => {
+        positions.set(note.CompositionId, position);
+        for (const name of FACET_NAMES) {
+            const value = note[FACET_FIELDS[name]] as string;
+            const values = facets.get(name)!;
+            let bits = values.get(value);
+            if (!bits) {
+                bits = createBitset(notes.length);
+                values.set(value, bits);
+            }
+            setBit(bits, position);
+        }
+    });
+
+    const dateKeys = notes.map((note) => note.DateTime?.substring(0, 10) ?? '');
+    const order = Array.from(notes.keys()).sort((a, b) => (dateKeys[a] < dateKeys[b] ? -1 : dateKeys[a] > dateKeys[b] ? 1 : a - b));
+
+    return {
+        notes,
+        positions,
+        facets,
+        dates: order.map((position) => dateKeys[position]),
+        datePositions: Int32Array.from(order),
+    };
+}
+
+/** Första index i sorted där värdet är >= value (eller > value om after) */
+function lowerBound(sorted: string[], value: string, after: boolean = false): number {
+    let low = 0;
+    let high = sorted.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (sorted[mid] < value || (after && sorted[mid] === value)) low = mid + 1;
+        else high = mid;
+    }
+    return low;
+}
+
+function dateRange(index: FilterIndex, minDate: string, maxDate: string): Bitset | null {
+    const start = minDate === '' ? 0 : lowerBound(index.dates, minDate);
+    const end = maxDate === '' ? index.dates.length : lowerBound(index.dates, maxDate, true);
+    if (start === 0 && end === index.dates.length) return null;
+
+    const bits = createBitset(index.notes.length);
+    for (let i = start; i < end; i++) setBit(bits, index.datePositions[i]);
+    return bits;
+}
+
+/** Anteckningar som har något av values för ett filter, null om filtret inte är aktivt */
+export function facetMatches(index: FilterIndex, name: FacetName, values: Set<string> | undefined): Bitset | null {
+    if (!values || values.size === 0) return null;
+
+    const bits = createBitset(index.notes.length);
+    const byValue = index.facets.get(name)!;
+    for (const value of values) {
+        const valueBits = byValue.get(value);
+        if (valueBits) orInto(bits, valueBits);
+    }
+    return bits;
+}
+
+/**
+ * De begränsningar i state som inte är filter-val (datum och sökord), som
+ * bitmängder. Inaktiva begränsningar utelämnas.
+ */
+export function baseConstraints(index: FilterIndex, state: FilterState): Bitset[] {
+    const constraints: Bitset[] = [];
+
+    const dates = dateRange(index, state.minDate, state.maxDate);
+    if (dates) constraints.push(dates);
+
+    if (state.compositionIds) {
+        const bits = createBitset(index.notes.length);
+        for (const id of state.compositionIds) {
+            const position = index.positions.get(id);
+            if (position !== undefined) setBit(bits, position);
+        }
+        constraints.push(bits);
+    }
+
+    return constraints;
+}
+
+/** Snittet av alla bitmängder (alla anteckningar om listan är tom) */
+export function intersectAll(index: FilterIndex, constraints: Bitset[]): Bitset {
+    const result = createBitset(index.notes.length, true);
+    for (const bits of constraints) andInto(result, bits);
+    return result;
+}
+
+export type FacetCounts = Map<FacetName, Map<string, number>>;
+
+/**
+ * Mellanresultat som sparas mellan körningar så att en ändring i ett filter
+ * bara räknar om det som beror på just det filtret.
+ */
+export type FacetCache = {
+    index: FilterIndex | null;
+    baseInputs: unknown[];
+    base: Bitset[];
+    selections: Map<FacetName, Set<string> | undefined>;
+    facetBits: Map<FacetName, Bitset | null>;
+    countInputs: Map<FacetName, unknown[]>;
+    counts: FacetCounts;
+};
+
+export function createFacetCache(): FacetCache {
+    return {
+        index: null,
+        baseInputs: [],
+        base: [],
+        selections: new Map(),
+        facetBits: new Map(),
+        countInputs: new Map(),
+        counts: new Map(),
+    };
+}
+
+function sameInputs(a: unknown[] | undefined, b: unknown[]): boolean {
+    return a !== undefined && a.length === b.length && a.every((value, i) => value === b[i]);
+}
+
+/**
+ * Vilka anteckningar som matchar state: något valt värde inom varje filter,
+ * och alla filter, datum och sökord samtidigt. Räknar också hur många
+ * anteckningar varje värde i varje filter skulle ge med de andra filtren
+ * som de är. Antalet för ett
+ * filter beror inte på vad som är valt i filtret självt, så när bara ett
+ * filter ändras räknas bara de andra filtrens antal om.
+ * @param index 
+ * @param state 
+ * @param cache 
+ * @returns 
+ */
+export function filterWithCounts(index: FilterIndex, state: FilterState, cache: FacetCache): { matches: Bitset; counts: FacetCounts } {
+    if (cache.index?.positions !== index.positions) {
+        Object.assign(cache, createFacetCache());
+    }
+    cache.index = index;
+
+    const baseInputs = [state.minDate, state.maxDate, state.compositionIds];
+    if (!sameInputs(cache.baseInputs, baseInputs)) {
+        cache.baseInputs = baseInputs;
+        cache.base = baseConstraints(index, state);
+    }
+
+    for (const name of FACET_NAMES) {
+        const selected = state.facets.get(name);
+        if (!cache.facetBits.has(name) || cache.selections.get(name) !== selected) {
+            cache.selections.set(name, selected);
+            cache.facetBits.set(name, facetMatches(index, name, selected));
+        }
+    }
+
+    let matches: Bitset | null = null;
+    for (const name of FACET_NAMES) {
+        const others = FACET_NAMES.filter((other) => other !== name).map((other) => cache.facetBits.get(other)!);
+        const inputs = [...cache.base, ...others];
+        const stale = !sameInputs(cache.countInputs.get(name), inputs);
+        if (!stale && matches) continue;
+
+        const excluding = intersectAll(index, inputs.filter((bits): bits is Bitset => bits !== null));
+
+        if (stale) {
+            const counts = new Map<string, number>();
+            for (const [value, bits] of index.facets.get(name)!) {
+                counts.set(value, countAnd(excluding, bits));
+            }
+            cache.countInputs.set(name, inputs);
+            cache.counts.set(name, counts);
+        }
+
+        if (!matches) {
+            matches = excluding;
+            const own = cache.facetBits.get(name);
+            if (own) andInto(matches, own);
+        }
+    }
+
+    return { matches: matches!, counts: new Map(cache.counts) };
+}
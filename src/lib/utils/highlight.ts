@@ -0,0 +1,147 @@
+import type { Note } from '$lib/models';
+import { stringToColor } from './colorUtils';
+
+const MAX_CACHED_PATTERNS = 64;
+const keywordPatterns = new Map<string, RegExp>();
+
+function escapeRegExp(text: string): string {
+    return text.replace(/[-/\\^$*+?.()|[\]{}]/g, '\\$&');
+}
+
+/**
+ * Ett RegExp som hittar <b>sökord</b> för någon av sökorden. Kompileras en
+ * gång per uppsättning sökord.
+ * @param keywords 
+ * @returns 
+ */
+export function getKeywordPattern(keywords: readonly string[]): RegExp {
+    const key = keywords.join('\u0000');
+    let pattern = keywordPatterns.get(key);
+    if (!pattern) {
+        pattern = new RegExp(`(<b>(${keywords.map(escapeRegExp).join('|')})</b>)`, 'gi');
+        if (keywordPatterns.size >= MAX_CACHED_PATTERNS) {
+            keywordPatterns.delete(keywordPatterns.keys().next().value!);
+        }
+        keywordPatterns.set(key, pattern);
+    }
+    return pattern;
+}
+
+// Per note object, so a new body (a new object) is highlighted again and the old entry can be collected
+const highlightedBodies = new WeakMap<Note, { keywords: readonly string[]; html: string }>();
+
+/**
+ * Anteckningens CaseData med de valda sökorden färgade. Resultatet sparas
+ * och återanvänds så länge anteckningen och sökorden är desamma.
+ * @param note 
+ * @param keywords 
+ * @returns 
+ */
+export function highlightKeywords(note: Note, keywords: readonly string[]): string {
+    const cached = highlightedBodies.get(note);
+    if (cached && cached.keywords === keywords) return cached.html;
+
+    const html = keywords.length === 0
+        ? note.CaseData
+        : note.CaseData.replace(
+            getKeywordPattern(keywords),
+            (match, p1, p2) => `<span style="background-color: ${stringToColor(p2)}; font-weight: bold;">${p2}</span>`
+        );
+    highlightedBodies.set(note, { keywords, html });
+    return html;
+}
+
+type TextSegment = {
+    text: string;
+    lowerText: string;
+    /** Noderna som just nu visar texten, antingen den ursprungliga textnoden eller text och <mark> */
+    nodes: ChildNode[];
+};
+
+type SearchState = {
+    html: string;
+    query: string;
+    segments: TextSegment[];
+    /** Segment som har träffar för query */
+    matched: Set<TextSegment>;
+};
+
+function collectSegments(root: Node): TextSegment[] {
+    const segments: TextSegment[] = [];
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const text = node.textContent ?? '';
+        if (text) segments.push({ text, lowerText: text.toLowerCase(), nodes: [node as ChildNode] });
+    }
+    return segments;
+}
+
+function renderSegment(segment: TextSegment, pattern: RegExp | null) {
+    const nodes: ChildNode[] = [];
+    if (pattern) {
+        let last = 0;
+        for (const match of segment.text.matchAll(pattern)) {
+            if (match.index! > last) nodes.push(document.createTextNode(segment.text.slice(last, match.index)));
+            const mark = document.createElement('mark');
+            mark.textContent = match[0];
+            nodes.push(mark);
+            last = match.index! + match[0].length;
+        }
+        if (last < segment.text.length) nodes.push(document.createTextNode(segment.text.slice(last)));
+    } else {
+        nodes.push(document.createTextNode(segment.text));
+    }
+
+    const first = segment.nodes[0];
+    first.before(...nodes);
+    for (const node of segment.nodes) node.remove();
+    segment.nodes = nodes;
+}
+
+function applyQuery(state: SearchState, query: string) {
+    const lowerQuery = query.toLowerCase();
+    const previous = state.query.toLowerCase();
+
+    // While typing, the new query extends the old one, so only segments that matched can still match
+    const candidates = previous !== '' && lowerQuery.startsWith(previous) ? state.matched : state.segments;
+    const pattern = lowerQuery === '' ? null : new RegExp(escapeRegExp(query), 'gi');
+    const matched = new Set<TextSegment>();
+
+    for (const segment of candidates) {
+        if (pattern && segment.lowerText.includes(lowerQuery)) matched.add(segment);
+    }
+
+    // Only segments whose matches changed are touched in the DOM
+    for (const segment of state.matched) {
+        if (!matched.has(segment)) renderSegment(segment, null);
+    }
+    for (const segment of matched) {
+        renderSegment(segment, pattern);
+    }
+
+    state.query = query;
+    state.matched = matched;
+}
+
+/**
+ * Action som visar html i elementet och markerar query med <mark>. När bara
+ * query ändras uppdateras endast de textnoder vars träffar ändrats, i stället
+ * för att hela dokumentet tolkas och serialiseras om.
+ * @param node 
+ * @param params 
+ * @returns 
+ */
+export function searchHighlight(node: HTMLElement, params: { html: string; query: string }) {
+    let state: SearchState | null = null;
+
+    function update({ html, query }: { html: string; query: string }) {
+        if (!state || state.html !== html) {
+            node.innerHTML = html;
+            state = { html, query: '', segments: collectSegments(node), matched: new Set() };
+        }
+        if (state.query !== query) applyQuery(state, query);
+    }
+
+    update(params);
+    return { update };
+}
@@ -0,0 +1,57 @@
+const NAMED_ENTITIES: Record<string, string> = {
+    amp: "&",
+    lt: "<",
+    gt: ">",
+    quot: '"',
+    apos: "'",
+    nbsp: " ",
+    aring: "å",
+    Aring: "Å",
+    auml: "ä",
+    Auml: "Ä",
+    ouml: "ö",
+    Ouml: "Ö",
+    eacute: "é",
+    Eacute: "É",
+};
+
+/**
+ * Avkodar HTML-entiteter (namngivna och numeriska) i en textsträng.
+ * @param text 
+ * @returns 
+ */
+export function decodeEntities(text: string): string {
+    if (!text.includes("&")) return text;
+    return text.replace(/&(#x[0-9a-f]+|#\d+|[a-z]+);/gi, (match, entity: string) => {
+        if (entity[0] === "#") {
+            const code = entity[1] === "x" || entity[1] === "X"
+                ? parseInt(entity.slice(2), 16)
+                : parseInt(entity.slice(1), 10);
+            return Number.isFinite(code) ? String.fromCodePoint(code) : match;
+        }
+        return NAMED_ENTITIES[entity] ?? match;
+    });
+}
+
+/**
+ * Gör om HTML till ren text utan att gå via DOM, så att det fungerar på
+ * servern och i web workers. Motsvarar textContent.
+ * @param html 
+ * @returns 
+ */
+export function htmlToText(html: string): string {
+    return decodeEntities(html.replace(/<[^>]*>/g, ""));
+}
+
+/**
+ * Escapar text så att den kan läggas in med {@html}.
+ * @param text 
+ * @returns 
+ */
+export function escapeHtml(text: string): string {
+    return text
+        .replace(/&/g, "&amp;")
+        .replace(/</g, "&lt;")
+        .replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;");
+}
@@ -1,3 +1,23 @@
-export {buildDateHierarchy} from './timelineUtils';
+export {updateDateHierarchy, yearKey, monthKey} from './timelineUtils';
+export type {DateHierarchy} from './timelineUtils';
 export {stringToColor} from './colorUtils';
-export {extractBoldTitlesFromHTML, getSortedUniqueKeywordNames} from './keywordUtils';
\ No newline at end of file
+export {extractBoldTitlesFromHTML, extractKeywordContexts, getSortedUniqueKeywordNames, getKeywordsByComposition} from './keywordUtils';
+export {readNdjson} from './ndjson';
+export {DEFAULT_EHR_ID, ehrIds, isValidEhrId, isValidCompositionId} from './ehrId';
+export {createKeywordIndex, updateKeywordIndex, diffKeywordIndex, applyKeywordDelta, getNotesWithAnyKeyword, matchNoteKeywords, getKeywordContext, NO_KEYWORDS} from './keywordIndex';
+export type {KeywordIndex, KeywordDelta} from './keywordIndex';
+export {decodeEntities, htmlToText, escapeHtml} from './htmlUtils';
+export {buildFilterIndex, filterWithCounts, createFacetCache, FACET_NAMES, FACET_FIELDS} from './filterEngine';
+export type {FilterIndex, FilterState, FacetName, FacetCounts, FacetCache} from './filterEngine';
+export {getTimestamp} from './dateUtils';
+export {sortByNewest, partitionNotes} from './listModel';
+export type {NoteOrder} from './listModel';
+export {getVisibleRange} from './virtualWindow';
+export type {VisibleRange} from './virtualWindow';
+export {layoutTimeline, monthsInView, NOTE_WIDTHS, TIMELINE_GAP} from './timelineLayout';
+export type {MonthLayout, NoteLayout, TimelineLayout, NoteSizeState} from './timelineLayout';
+export {createOutOfViewTracker, outOfViewKey, setNoteSide, recountOutOfView} from './outOfView';
+export type {OutOfViewTracker, Side, Direction} from './outOfView';
+export {getKeywordPattern, highlightKeywords, searchHighlight} from './highlight';
+export {tokenize, createTextIndex, updateTextIndex, searchTextIndex, getHitSnippet} from './textIndex';
+export type {TextIndex, TextHit} from './textIndex';
@@ -0,0 +1,203 @@
+import type { Note } from '$lib/models';
+import { extractBoldTitlesFromHTML, extractKeywordContexts, getKeywordsByComposition } from './keywordUtils';
+
+type Keyword = { Name: string; CompositionId: string };
+
+export type KeywordIndex = {
+    /** Sökord -> CompositionId för anteckningar där sökordet förekommer */
+    byKeyword: Map<string, Set<string>>;
+    /** CompositionId -> anteckningens sökord (fetstilta rubriker), sorterade */
+    byNote: Map<string, string[]>;
+    /** CompositionId -> den CaseData som byNote bygger på */
+    sources: Map<string, string>;
+    /** CompositionId -> rubrik i gemener -> texten efter rubriken. Tas fram en gång när CaseData kommer */
+    contexts: Map<string, Map<string, string>>;
+    /** Sökordsvyn som användes för anteckningar utan hämtad CaseData */
+    keywords: Keyword[] | null;
+};
+
+export function createKeywordIndex(): KeywordIndex {
+    return { byKeyword: new Map(), byNote: new Map(), sources: new Map(), contexts: new Map(), keywords: null };
+}
+
+function removeNote(index: KeywordIndex, compositionId: string) {
+    for (const title of index.byNote.get(compositionId) ?? []) {
+        const ids = index.byKeyword.get(title);
+        ids?.delete(compositionId);
+        if (ids?.size === 0) index.byKeyword.delete(title);
+    }
+    index.byNote.delete(compositionId);
+    index.sources.delete(compositionId);
+    index.contexts.delete(compositionId);
+}
+
+function addNote(index: KeywordIndex, compositionId: string, titles: string[], source?: string) {
+    index.byNote.set(compositionId, titles);
+    if (source !== undefined) index.sources.set(compositionId, source);
+    for (const title of titles) {
+        let ids = index.byKeyword.get(title);
+        if (!ids) {
+            ids = new Set<string>();
+            index.byKeyword.set(title, ids);
+        }
+        ids.add(compositionId);
+    }
+}
+
+/**
+ * Uppdaterar sökordsindexet så att det motsvarar notes. Bara anteckningar
+ * vars CaseData har ändrats sedan förra anropet parsas om. Anteckningar utan
+ * hämtad CaseData får sina sökord från sökordsvyn (RSK.View.Keywords).
+ * @param index 
+ * @param notes 
+ * @param keywords 
+ * @returns samma index, uppdaterat
+ */
+export function updateKeywordIndex(index: KeywordIndex, notes: Note[], keywords: Keyword[]): KeywordIndex {
+    if (index.keywords !== keywords) {
+        // Titles of notes without CaseData came from the old keywords view, so start over
+        index.byKeyword.clear();
+        index.byNote.clear();
+        index.sources.clear();
+        index.contexts.clear();
+        index.keywords = keywords;
+    }
+
+    let keywordsByComposition: Map<string, Set<string>> | null = null;
+    const seen = new Set<string>();
+
+    for (const note of notes) {
+        const id = note.CompositionId;
+        if (!id || seen.has(id)) continue;
+        seen.add(id);
+
+        if (index.sources.get(id) === note.CaseData) continue;
+        removeNote(index, id);
+
+        let titles: string[];
+        if (note.CaseData === '') {
+            keywordsByComposition ??= getKeywordsByComposition(keywords);
+            titles = Array.from(keywordsByComposition.get(id) ?? []).sort((a, b) => a.localeCompare(b, 'sv'));
+        } else {
+            titles = extractBoldTitlesFromHTML(note.CaseData);
+            index.contexts.set(id, extractKeywordContexts(note.CaseData));
+        }
+        addNote(index, id, titles, note.CaseData);
+    }
+
+    if (seen.size !== index.byNote.size) {
+        for (const id of Array.from(index.byNote.keys())) {
+            if (!seen.has(id)) removeNote(index, id);
+        }
+    }
+
+    return index;
+}
+
+/** Det som ändrats i ett sökordsindex, i en form som kan skickas mellan trådar */
+export type KeywordDelta = {
+    /** CompositionId, sökord och [rubrik i gemener, text] för nya eller ändrade anteckningar */
+    changed: [string, string[], [string, string][]][];
+    removed: string[];
+};
+
+/**
+ * Vilka anteckningar som fått andra sökord sedan before. Sökordslistor byts
+ * ut (ändras aldrig på plats) när en anteckning indexeras om, så det räcker
+ * att jämföra referenser.
+ * @param before kopia av index.byNote från före uppdateringen
+ * @param index 
+ * @returns 
+ */
+export function diffKeywordIndex(before: Map<string, string[]>, index: KeywordIndex): KeywordDelta {
+    const delta: KeywordDelta = { changed: [], removed: [] };
+    for (const [id, titles] of index.byNote) {
+        if (before.get(id) !== titles) {
+            delta.changed.push([id, titles, Array.from(index.contexts.get(id) ?? [])]);
+        }
+    }
+    for (const id of before.keys()) {
+        if (!index.byNote.has(id)) delta.removed.push(id);
+    }
+    return delta;
+}
+
+/**
+ * För in en ändring från diffKeywordIndex i ett index som inte själv parsar
+ * någon CaseData, t.ex. en kopia i huvudtråden.
+ * @param index 
+ * @param delta 
+ * @returns samma index, uppdaterat
+ */
+export function applyKeywordDelta(index: KeywordIndex, delta: KeywordDelta): KeywordIndex {
+    for (const id of delta.removed) removeNote(index, id);
+    for (const [id, titles, contexts] of delta.changed) {
+        removeNote(index, id);
+        addNote(index, id, titles);
+        if (contexts.length > 0) index.contexts.set(id, new Map(contexts));
+    }
+    return index;
+}
+
+/**
+ * CompositionId för alla anteckningar som har minst ett av sökorden.
+ * @param index 
+ * @param keywords 
+ * @returns 
+ */
+export function getNotesWithAnyKeyword(index: KeywordIndex, keywords: Iterable<string>): Set<string> {
+    const matches = new Set<string>();
+    for (const keyword of keywords) {
+        for (const id of index.byKeyword.get(keyword) ?? []) {
+            matches.add(id);
+        }
+    }
+    return matches;
+}
+
+/** Delas av alla anteckningar som saknar valda sökord, så att tomma listor inte skapas om */
+export const NO_KEYWORDS: readonly string[] = Object.freeze([]);
+
+/**
+ * Valda sökord per anteckning (CompositionId), i den ordning de valdes.
+ * Bara anteckningar med minst ett valt sökord finns med. Listor som inte
+ * ändrats sedan previous återanvänds, och om ingen anteckning ändrats
+ * returneras previous självt.
+ * @param index 
+ * @param selected 
+ * @param previous 
+ * @returns 
+ */
+export function matchNoteKeywords(
+    index: KeywordIndex,
+    selected: Set<string>,
+    previous: Map<string, readonly string[]>
+): Map<string, readonly string[]> {
+    const selectedKeywords = Array.from(selected);
+    const next = new Map<string, readonly string[]>();
+    let changed = false;
+
+    for (const id of getNotesWithAnyKeyword(index, selectedKeywords)) {
+        const matches = selectedKeywords.filter((keyword) => index.byKeyword.get(keyword)?.has(id));
+        const old = previous.get(id);
+        if (old && old.length === matches.length && old.every((keyword, i) => keyword === matches[i])) {
+            next.set(id, old);
+        } else {
+            next.set(id, matches);
+            changed = true;
+        }
+    }
+
+    return changed || next.size !== previous.size ? next : previous;
+}
+
+/**
+ * Texten efter sökordet i anteckningen, från indexet.
+ * @param index 
+ * @param compositionId 
+ * @param keyword 
+ * @returns tom sträng om anteckningens CaseData inte är hämtad eller sökordet saknar text
+ */
+export function getKeywordContext(index: KeywordIndex, compositionId: string, keyword: string): string {
+    return index.contexts.get(compositionId)?.get(keyword.toLowerCase()) ?? '';
+}
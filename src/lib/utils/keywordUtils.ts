@@ -1,19 +1,17 @@
-import { browser } from '$app/environment';
+import { htmlToText } from './htmlUtils';
+
+const BOLD_TAG = /<b(?:\s[^>]*)?>([\s\S]*?)<\/b>/gi;
 
 /**
  * Tar ut all text som är markerad med <b> från samtiliga anteckningar.
- * Sorterar listan i alfabetisk ordning. 
+ * Sorterar listan i alfabetisk ordning. Använder inte DOM och kan därför
+ * köras på servern och i workers.
  * @param html 
  * @returns 
  */
 export function extractBoldTitlesFromHTML(html: string): string[] {
-    if (!browser) return [];
-    const container = document.createElement("div");
-    container.innerHTML = html;
-
-    const boldTags = Array.from(container.querySelectorAll("b"));
-    const titles = boldTags
-        .map(b => b.textContent?.trim() ?? "")
+    const titles = Array.from(html.matchAll(BOLD_TAG))
+        .map(match => htmlToText(match[1]).trim())
         .filter(Boolean);
 
     const uniqueTitles = Array.from(new Set(titles));
@@ -32,4 +30,65 @@ export function getSortedUniqueKeywordNames(keywords: { Name: string }[]): strin
   
     const uniqueNames = Array.from(new Set(names));
     return uniqueNames.sort((a, b) => a.localeCompare(b, 'sv'));
-}
\ No newline at end of file
+}
+
+/**
+ * Bygger upp vilka sökord varje anteckning (CompositionId) har enligt
+ * RSK.View.Keywords. Används för anteckningar vars CaseData inte är hämtad än.
+ * @param keywords 
+ * @returns 
+ */
+export function getKeywordsByComposition(keywords: { Name: string; CompositionId: string }[]): Map<string, Set<string>> {
+    const byComposition = new Map<string, Set<string>>();
+    for (const keyword of keywords) {
+        const name = keyword.Name?.trim();
+        if (!name || !keyword.CompositionId) continue;
+
+        let names = byComposition.get(keyword.CompositionId);
+        if (!names) {
+            names = new Set<string>();
+            byComposition.set(keyword.CompositionId, names);
+        }
+        names.add(name);
+    }
+    return byComposition;
+}
+
+const CONTEXT_MAX_LENGTH = 60;
+const VOID_TAGS = new Set(['br', 'hr', 'img', 'input', 'wbr']);
+const OPENING_TAG = /^<([a-z][a-z0-9]*)\b[^>]*>/i;
+
+/** textContent för noden direkt efter position i html, som nextSibling.textContent */
+function nextSiblingText(html: string, position: number): string {
+    const tag = html.slice(position).match(OPENING_TAG);
+    if (!tag) {
+        const end = html.indexOf('<', position);
+        return htmlToText(html.slice(position, end === -1 ? undefined : end));
+    }
+
+    const name = tag[1].toLowerCase();
+    if (VOID_TAGS.has(name)) return '';
+    const start = position + tag[0].length;
+    const close = html.toLowerCase().indexOf(`</${name}>`, start);
+    return htmlToText(html.slice(start, close === -1 ? undefined : close));
+}
+
+/**
+ * Texten som följer varje <b>-rubrik i en anteckning, förkortad till 60
+ * tecken. Nyckeln är rubriken i gemener. Om samma rubrik förekommer flera
+ * gånger används den första som följs av text.
+ * @param html 
+ * @returns 
+ */
+export function extractKeywordContexts(html: string): Map<string, string> {
+    const contexts = new Map<string, string>();
+    for (const match of html.matchAll(BOLD_TAG)) {
+        const title = htmlToText(match[1]).trim().toLowerCase();
+        if (!title || contexts.has(title)) continue;
+
+        const text = nextSiblingText(html, match.index! + match[0].length).trim();
+        if (!text) continue;
+        contexts.set(title, text.length > CONTEXT_MAX_LENGTH ? text.slice(0, CONTEXT_MAX_LENGTH) + '...' : text);
+    }
+    return contexts;
+}
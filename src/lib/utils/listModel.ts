@@ -0,0 +1,58 @@
+import type { Note } from '$lib/models';
+import { getTimestamp } from './dateUtils';
+
+export type NoteOrder = {
+    /** Listan som sorterades */
+    source: Note[];
+    /** Positioner i source, nyast först */
+    order: Int32Array;
+    sorted: Note[];
+};
+
+function sameOrderKeys(previous: Note[], notes: Note[]): boolean {
+    if (previous.length !== notes.length) return false;
+    for (let i = 0; i < notes.length; i++) {
+        if (previous[i] !== notes[i] && (previous[i].CompositionId !== notes[i].CompositionId || previous[i].DateTime !== notes[i].DateTime)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+/**
+ * Sorterar anteckningarna med den nyaste först. Om bara innehållet i
+ * anteckningarna har ändrats sedan previous återanvänds ordningen.
+ * @param notes 
+ * @param previous 
+ * @returns 
+ */
+export function sortByNewest(notes: Note[], previous: NoteOrder | null = null): NoteOrder {
+    if (previous?.source === notes) return previous;
+
+    let order: Int32Array;
+    if (previous && sameOrderKeys(previous.source, notes)) {
+        order = previous.order;
+    } else {
+        const times = Float64Array.from(notes, getTimestamp);
+        // Ties keep their original order, like the stable sort this replaces
+        order = Int32Array.from(notes.keys()).sort((a, b) => times[b] - times[a] || a - b);
+    }
+
+    return { source: notes, order, sorted: Array.from(order, (position) => notes[position]) };
+}
+
+/**
+ * Delar upp de sorterade anteckningarna i de som finns i filteredIds och de
+ * som inte gör det, i ett enda pass och med ordningen bevarad.
+ * @param sorted 
+ * @param filteredIds 
+ * @returns 
+ */
+export function partitionNotes(sorted: Note[], filteredIds: Set<string>): { filtered: Note[]; nonFiltered: Note[] } {
+    const filtered: Note[] = [];
+    const nonFiltered: Note[] = [];
+    for (const note of sorted) {
+        (filteredIds.has(note.CompositionId) ? filtered : nonFiltered).push(note);
+    }
+    return { filtered, nonFiltered };
+}
@@ -0,0 +1,28 @@
+/**
+ * Läser en NDJSON-ström och ger tillbaka de rader som kom i varje
+ * nätverksblock, så att mottagaren kan uppdatera sina stores en gång per block.
+ * @param body 
+ * @returns 
+ */
+export async function* readNdjson<T>(body: ReadableStream<Uint8Array>): AsyncGenerator<T[]> {
+    const reader = body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += value;
+            const lines = buffer.split("\n");
+            buffer = lines.pop() ?? "";
+
+            const batch = lines.filter((line) => line.trim()).map((line) => JSON.parse(line) as T);
+            if (batch.length > 0) yield batch;
+        }
+
+        if (buffer.trim()) yield [JSON.parse(buffer) as T];
+    } finally {
+        reader.releaseLock();
+    }
+}
@@ -0,0 +1,73 @@
+export type Direction = 'left' | 'right';
+
+export type Side = { left: boolean; right: boolean };
+
+export type OutOfViewTracker = {
+    /** CompositionId -> åt vilket håll anteckningen är utanför vyn */
+    sides: Map<string, Side>;
+    /** CompositionId -> sökorden som räknades för anteckningen */
+    keywords: Map<string, readonly string[]>;
+    /** "sökord::riktning" -> antal anteckningar, bara antal över noll */
+    counts: Map<string, number>;
+};
+
+export function createOutOfViewTracker(): OutOfViewTracker {
+    return { sides: new Map(), keywords: new Map(), counts: new Map() };
+}
+
+export function outOfViewKey(keyword: string, direction: Direction): string {
+    return `${keyword}::${direction}`;
+}
+
+function addCounts(tracker: OutOfViewTracker, keywords: readonly string[], side: Side, delta: number) {
+    for (const keyword of keywords) {
+        for (const direction of ['left', 'right'] as const) {
+            if (!side[direction]) continue;
+            const key = outOfViewKey(keyword, direction);
+            const count = (tracker.counts.get(key) ?? 0) + delta;
+            if (count > 0) tracker.counts.set(key, count);
+            else tracker.counts.delete(key);
+        }
+    }
+}
+
+/**
+ * Sätter var en anteckning är i förhållande till vyn och uppdaterar antalen
+ * för dess sökord.
+ * @param tracker 
+ * @param compositionId 
+ * @param keywords 
+ * @param side 
+ * @returns true om något antal ändrades
+ */
+export function setNoteSide(tracker: OutOfViewTracker, compositionId: string, keywords: readonly string[], side: Side): boolean {
+    const oldSide = tracker.sides.get(compositionId);
+    const oldKeywords = tracker.keywords.get(compositionId);
+    if (oldSide && oldSide.left === side.left && oldSide.right === side.right && oldKeywords === keywords) return false;
+
+    if (oldSide && oldKeywords) addCounts(tracker, oldKeywords, oldSide, -1);
+    addCounts(tracker, keywords, side, 1);
+    tracker.sides.set(compositionId, side);
+    tracker.keywords.set(compositionId, keywords);
+    return keywords.length > 0 || (oldKeywords?.length ?? 0) > 0;
+}
+
+/**
+ * Räknar om alla antal med nya sökord. Anteckningar som keywordsOf
+ * returnerar null för tas bort.
+ * @param tracker 
+ * @param keywordsOf 
+ */
+export function recountOutOfView(tracker: OutOfViewTracker, keywordsOf: (compositionId: string) => readonly string[] | null) {
+    tracker.counts.clear();
+    for (const [compositionId, side] of tracker.sides) {
+        const keywords = keywordsOf(compositionId);
+        if (keywords === null) {
+            tracker.sides.delete(compositionId);
+            tracker.keywords.delete(compositionId);
+            continue;
+        }
+        tracker.keywords.set(compositionId, keywords);
+        addCounts(tracker, keywords, side, 1);
+    }
+}
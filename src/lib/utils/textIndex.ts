@@ -0,0 +1,203 @@
+import type { Note } from '$lib/models';
+import { decodeEntities } from './htmlUtils';
+
+// Letters (including å, ä, ö, é) and digits; everything else separates words
+const WORD = /[\p{L}\p{N}]+/gu;
+
+// BM25 parameters
+const K1 = 1.2;
+const B = 0.75;
+
+/** Text utan taggar, där taggar blir mellanslag så att ord i olika stycken inte slås ihop */
+function plainText(html: string): string {
+    return decodeEntities(html.replace(/<[^>]*>/g, ' '));
+}
+
+export type TextIndex = {
+    /** Ord -> CompositionId -> antal förekomster i anteckningen */
+    postings: Map<string, Map<string, number>>;
+    /** CompositionId -> anteckningens unika ord, för att kunna ta bort den */
+    docTerms: Map<string, string[]>;
+    /** CompositionId -> antal ord i anteckningen */
+    docLengths: Map<string, number>;
+    /** CompositionId -> den CaseData som indexerades */
+    sources: Map<string, string>;
+    totalLength: number;
+    /** Alla ord i bokstavsordning för prefixsökning, null när de behöver sorteras om */
+    sortedTerms: string[] | null;
+};
+
+export type TextHit = {
+    compositionId: string;
+    score: number;
+};
+
+/**
+ * Delar upp text i ord med svenska regler för gemener. Å, ä och ö behålls
+ * som egna bokstäver.
+ * @param text 
+ * @returns 
+ */
+export function tokenize(text: string): string[] {
+    return text.normalize('NFC').toLocaleLowerCase('sv-SE').match(WORD) ?? [];
+}
+
+export function createTextIndex(): TextIndex {
+    return {
+        postings: new Map(),
+        docTerms: new Map(),
+        docLengths: new Map(),
+        sources: new Map(),
+        totalLength: 0,
+        sortedTerms: [],
+    };
+}
+
+function removeDocument(index: TextIndex, compositionId: string) {
+    for (const term of index.docTerms.get(compositionId) ?? []) {
+        const docs = index.postings.get(term);
+        docs?.delete(compositionId);
+        if (docs?.size === 0) {
+            index.postings.delete(term);
+            index.sortedTerms = null;
+        }
+    }
+    index.totalLength -= index.docLengths.get(compositionId) ?? 0;
+    index.docTerms.delete(compositionId);
+    index.docLengths.delete(compositionId);
+    index.sources.delete(compositionId);
+}
+
+function addDocument(index: TextIndex, compositionId: string, caseData: string) {
+    const tokens = tokenize(plainText(caseData));
+    const counts = new Map<string, number>();
+    for (const token of tokens) counts.set(token, (counts.get(token) ?? 0) + 1);
+
+    for (const [term, count] of counts) {
+        let docs = index.postings.get(term);
+        if (!docs) {
+            docs = new Map();
+            index.postings.set(term, docs);
+            index.sortedTerms = null;
+        }
+        docs.set(compositionId, count);
+    }
+
+    index.docTerms.set(compositionId, Array.from(counts.keys()));
+    index.docLengths.set(compositionId, tokens.length);
+    index.sources.set(compositionId, caseData);
+    index.totalLength += tokens.length;
+}
+
+/**
+ * Uppdaterar fritextindexet så att det motsvarar notes. Bara anteckningar
+ * vars CaseData har ändrats indexeras om. Anteckningar utan hämtad CaseData
+ * finns inte med.
+ * @param index 
+ * @param notes 
+ * @returns samma index, uppdaterat
+ */
+export function updateTextIndex(index: TextIndex, notes: Note[]): TextIndex {
+    const seen = new Set<string>();
+
+    for (const note of notes) {
+        const id = note.CompositionId;
+        if (!id || seen.has(id)) continue;
+        seen.add(id);
+
+        const caseData = note.CaseData ?? '';
+        if (index.sources.get(id) === caseData) continue;
+        if (index.sources.has(id)) removeDocument(index, id);
+        if (caseData !== '') addDocument(index, id, caseData);
+    }
+
+    if (seen.size !== index.sources.size) {
+        for (const id of Array.from(index.sources.keys())) {
+            if (!seen.has(id)) removeDocument(index, id);
+        }
+    }
+
+    return index;
+}
+
+/** Alla ord i indexet som börjar med prefix */
+function expandPrefix(index: TextIndex, prefix: string): string[] {
+    index.sortedTerms ??= Array.from(index.postings.keys()).sort();
+    const terms = index.sortedTerms;
+
+    let low = 0;
+    let high = terms.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (terms[mid] < prefix) low = mid + 1;
+        else high = mid;
+    }
+
+    const matches: string[] = [];
+    for (let i = low; i < terms.length && terms[i].startsWith(prefix); i++) matches.push(terms[i]);
+    return matches;
+}
+
+/**
+ * Söker efter anteckningar som innehåller alla ord i query. Varje ord
+ * matchar även längre ord som börjar likadant ("smärt" hittar "smärtor").
+ * Träffarna rangordnas med BM25.
+ * @param index 
+ * @param query 
+ * @returns träffar, bäst först
+ */
+export function searchTextIndex(index: TextIndex, query: string): TextHit[] {
+    const queryTerms = Array.from(new Set(tokenize(query)));
+    const documentCount = index.docLengths.size;
+    if (queryTerms.length === 0 || documentCount === 0) return [];
+
+    const averageLength = index.totalLength / documentCount || 1;
+    let scores: Map<string, number> | null = null;
+
+    for (const queryTerm of queryTerms) {
+        // Best score per document over all words the query word expands to
+        const termScores = new Map<string, number>();
+        for (const term of expandPrefix(index, queryTerm)) {
+            const docs = index.postings.get(term)!;
+            const idf = Math.log(1 + (documentCount - docs.size + 0.5) / (docs.size + 0.5));
+            for (const [id, count] of docs) {
+                if (scores && !scores.has(id)) continue;
+                const length = index.docLengths.get(id) ?? 0;
+                const score = idf * (count * (K1 + 1)) / (count + K1 * (1 - B + B * (length / averageLength)));
+                if (score > (termScores.get(id) ?? 0)) termScores.set(id, score);
+            }
+        }
+
+        if (scores) {
+            for (const [id, score] of termScores) termScores.set(id, score + scores.get(id)!);
+        }
+        scores = termScores;
+        if (scores.size === 0) break;
+    }
+
+    return Array.from(scores ?? [], ([compositionId, score]) => ({ compositionId, score }))
+        .sort((a, b) => b.score - a.score);
+}
+
+/**
+ * Ett utdrag ur anteckningens text runt första träffen för query.
+ * @param caseData 
+ * @param query 
+ * @param radius antal tecken före och efter träffen
+ * @returns 
+ */
+export function getHitSnippet(caseData: string, query: string, radius: number = 40): string {
+    const text = plainText(caseData).replace(/\s+/g, ' ').trim();
+    const lowerText = text.toLocaleLowerCase('sv-SE');
+
+    let position = -1;
+    for (const term of tokenize(query)) {
+        const found = lowerText.indexOf(term);
+        if (found !== -1 && (position === -1 || found < position)) position = found;
+    }
+    if (position === -1) return text.slice(0, radius * 2);
+
+    const start = Math.max(0, position - radius);
+    const end = Math.min(text.length, position + radius);
+    return (start > 0 ? '...' : '') + text.slice(start, end) + (end < text.length ? '...' : '');
+}
@@ -0,0 +1,95 @@
+import type { Note, Year, Month } from '$lib/models';
+import { monthKey } from './timelineUtils';
+
+export type NoteSizeState = 'hidden' | 'compact' | 'medium' | 'expanded';
+
+/** Bredd i pixlar för en anteckning i varje läge, samma som klasserna i Timeline.svelte */
+export const NOTE_WIDTHS: Record<NoteSizeState, number> = {
+    hidden: 24,
+    compact: 48,
+    medium: 168,
+    expanded: 400,
+};
+
+/** Avstånd mellan år, månader och anteckningar (space-x-[8px]) */
+export const TIMELINE_GAP = 8;
+
+// A month header is w-6 while its year is collapsed
+const MIN_MONTH_WIDTH = 24;
+
+export type MonthLayout = {
+    year: number;
+    month: number;
+    /** Avstånd från tidslinjens vänsterkant */
+    left: number;
+    width: number;
+};
+
+export type NoteLayout = {
+    monthKey: string;
+    left: number;
+    width: number;
+};
+
+export type TimelineLayout = {
+    /** Månadsnyckel -> månad, i tidslinjens ordning */
+    months: Map<string, MonthLayout>;
+    /** CompositionId -> anteckning */
+    notes: Map<string, NoteLayout>;
+};
+
+/**
+ * Räknar ut var varje månad hamnar i tidslinjen utan att rendera den, så att
+ * månader utanför vyn kan ersättas med tomma platshållare av rätt bredd.
+ * @param hierarchy 
+ * @param sizeOf anteckningens läge, som i Timeline.svelte
+ * @returns position och bredd för varje månad och anteckning
+ */
+export function layoutTimeline(
+    hierarchy: Year[],
+    sizeOf: (year: Year, month: Month, note: Note) => NoteSizeState
+): TimelineLayout {
+    const months = new Map<string, MonthLayout>();
+    const notes = new Map<string, NoteLayout>();
+    let left = 0;
+
+    hierarchy.forEach((year, yearIndex) => {
+        if (yearIndex > 0) left += TIMELINE_GAP;
+
+        year.months.forEach((month, monthIndex) => {
+            if (monthIndex > 0) left += TIMELINE_GAP;
+
+            const key = monthKey(year.year, month.month);
+            let notesWidth = 0;
+            month.notes.forEach((note, noteIndex) => {
+                if (noteIndex > 0) notesWidth += TIMELINE_GAP;
+                const width = NOTE_WIDTHS[sizeOf(year, month, note)];
+                notes.set(note.CompositionId, { monthKey: key, left: left + notesWidth, width });
+                notesWidth += width;
+            });
+
+            const width = Math.max(MIN_MONTH_WIDTH, notesWidth);
+            months.set(key, { year: year.year, month: month.month, left, width });
+            left += width;
+        });
+    });
+
+    return { months, notes };
+}
+
+/**
+ * Månader som överlappar intervallet [left, right] i tidslinjen. months
+ * måste vara i tidslinjens ordning, som från layoutTimeline.
+ * @param months 
+ * @param left 
+ * @param right 
+ * @returns 
+ */
+export function monthsInView(months: Map<string, MonthLayout>, left: number, right: number): Set<string> {
+    const visible = new Set<string>();
+    for (const [key, month] of months) {
+        if (month.left > right) break;
+        if (month.left + month.width >= left) visible.add(key);
+    }
+    return visible;
+}
@@ -1,35 +1,161 @@
 import type { Note } from "$lib/models";
-import type { Year } from "$lib/models/dateHierarchy";
-
-export function buildDateHierarchy(notes: Note[]): Year[] {
-    const hierarchy: Year[] = [];
-    notes.forEach((note) => {
-        const noteDate = new Date(note.DateTime);
-        const noteYear = noteDate.getFullYear();
-        const noteMonth = noteDate.getMonth();
-
-        let yearGroup = hierarchy.find((y) => y.year === noteYear);
-        if (!yearGroup) {
-            yearGroup = { year: noteYear, months: [], isCollapsed: true };
-            hierarchy.push(yearGroup);
+import type { Year, Month } from "$lib/models/dateHierarchy";
+import { getTimestamp } from "./dateUtils";
+
+export function yearKey(year: number): string {
+    return `${year}`;
+}
+
+export function monthKey(year: number, month: number): string {
+    return `${year}-${month}`;
+}
+
+export type DateHierarchy = {
+    /** Anteckningarna som hierarkin byggdes från */
+    source: Note[];
+    years: Year[];
+    /** Månadsnyckel -> månad, så att rätt månad hittas utan att söka */
+    months: Map<string, Month>;
+    /** Månadsnyckel -> år */
+    monthYears: Map<string, number>;
+    /** Position i source -> månadsnyckel */
+    keys: string[];
+};
+
+function newestFirst(note1: Note, note2: Note): number {
+    return getTimestamp(note2) - getTimestamp(note1);
+}
+
+function placeNote(note: Note): { year: number; month: number; key: string } {
+    const date = new Date(getTimestamp(note));
+    const year = date.getFullYear();
+    const month = date.getMonth();
+    return { year, month, key: monthKey(year, month) };
+}
+
+function sameDates(previous: Note[], notes: Note[], length: number): boolean {
+    for (let i = 0; i < length; i++) {
+        if (previous[i] !== notes[i] && (previous[i].CompositionId !== notes[i].CompositionId || previous[i].DateTime !== notes[i].DateTime)) {
+            return false;
         }
+    }
+    return true;
+}
 
-        let monthGroup = yearGroup.months.find((m) => m.month === noteMonth);
-        if (!monthGroup) {
-            monthGroup = { month: noteMonth, notes: [], isCollapsed: true };
-            yearGroup.months.push(monthGroup);
+/** Sätter ihop åren från månaderna. År utan ändrade månader återanvänds. */
+function assembleYears(previous: Year[], months: Map<string, Month>, monthYears: Map<string, number>, touchedYears: Set<number>): Year[] {
+    const monthsByYear = new Map<number, Month[]>();
+    for (const [key, month] of months) {
+        const year = monthYears.get(key)!;
+        if (!touchedYears.has(year)) continue;
+        let yearMonths = monthsByYear.get(year);
+        if (!yearMonths) {
+            yearMonths = [];
+            monthsByYear.set(year, yearMonths);
         }
+        yearMonths.push(month);
+    }
 
-        monthGroup.notes.push(note);
+    const years = previous.filter((year) => !touchedYears.has(year.year));
+    for (const [year, yearMonths] of monthsByYear) {
+        years.push({ year, months: yearMonths.sort((month1, month2) => month2.month - month1.month) });
+    }
+    return years.sort((year1, year2) => year2.year - year1.year);
+}
+
+function buildFull(notes: Note[]): DateHierarchy {
+    const months = new Map<string, Month>();
+    const monthYears = new Map<string, number>();
+    const keys: string[] = new Array(notes.length);
+
+    notes.forEach((note, position) => {
+        const { year, month, key } = placeNote(note);
+        keys[position] = key;
+
+        let group = months.get(key);
+        if (!group) {
+            group = { month, notes: [] };
+            months.set(key, group);
+            monthYears.set(key, year);
+        }
+        group.notes.push(note);
     });
 
-    hierarchy.sort((year1, year2) => year2.year - year1.year);
-    hierarchy.forEach((y) => y.months.sort((month1, month2) => month2.month - month1.month));
-    hierarchy.forEach((y) =>
-        y.months.forEach((m) =>
-                m.notes.sort((note1, note2) => new Date(note2.DateTime).getTime() - new Date(note1.DateTime).getTime())
-        )
-    );
+    for (const month of months.values()) month.notes.sort(newestFirst);
+
+    const years = assembleYears([], months, monthYears, new Set(monthYears.values()));
+    return { source: notes, years, months, monthYears, keys };
+}
+
+/**
+ * Uppdaterar år/månad-hierarkin för notes utifrån previous. Om anteckningarna
+ * bara har fått nytt innehåll, eller nya anteckningar har lagts till sist,
+ * ändras bara de månader som berörs och övriga år och månader återanvänds.
+ * Annars byggs hierarkin om. Varje tidsstämpel tolkas bara en gång.
+ * @param notes 
+ * @param previous 
+ * @returns 
+ */
+export function updateDateHierarchy(notes: Note[], previous: DateHierarchy | null = null): DateHierarchy {
+    if (!previous) return buildFull(notes);
+    if (previous.source === notes) return previous;
+
+    const shared = previous.source.length;
+    if (notes.length < shared || !sameDates(previous.source, notes, shared)) return buildFull(notes);
+
+    const months = new Map(previous.months);
+    const monthYears = new Map(previous.monthYears);
+    const keys = previous.keys.slice();
+    const copied = new Set<string>();
+    const touchedYears = new Set<number>();
+
+    // Copy a month the first time it changes so the previous hierarchy is left as it was
+    function editableMonth(key: string, year: number, month: number): Month {
+        let group = months.get(key);
+        if (!group) {
+            group = { month, notes: [] };
+            monthYears.set(key, year);
+        } else if (!copied.has(key)) {
+            group = { month: group.month, notes: group.notes.slice() };
+        }
+        months.set(key, group);
+        copied.add(key);
+        touchedYears.add(year);
+        return group;
+    }
+
+    // Same notes in the same places, only the objects changed (e.g. CaseData arrived)
+    for (let position = 0; position < shared; position++) {
+        const before = previous.source[position];
+        const after = notes[position];
+        if (before === after) continue;
+
+        const key = keys[position];
+        const group = editableMonth(key, monthYears.get(key)!, months.get(key)!.month);
+        const index = group.notes.indexOf(before);
+        if (index !== -1) group.notes[index] = after;
+    }
+
+    // Added notes go into their month at the right place in time
+    for (let position = shared; position < notes.length; position++) {
+        const note = notes[position];
+        const { year, month, key } = placeNote(note);
+        keys[position] = key;
+
+        const group = editableMonth(key, year, month);
+        const time = getTimestamp(note);
+        let low = 0;
+        let high = group.notes.length;
+        while (low < high) {
+            const mid = (low + high) >>> 1;
+            if (getTimestamp(group.notes[mid]) >= time) low = mid + 1;
+            else high = mid;
+        }
+        group.notes.splice(low, 0, note);
+    }
+
+    if (touchedYears.size === 0) return { ...previous, source: notes };
 
-    return hierarchy;
-}
\ No newline at end of file
+    const years = assembleYears(previous.years, months, monthYears, touchedYears);
+    return { source: notes, years, months, monthYears, keys };
+}
@@ -0,0 +1,40 @@
+export type VisibleRange = {
+    /** Första och (exklusive) sista raden som ska renderas */
+    start: number;
+    end: number;
+    /** Höjd i pixlar för raderna före respektive efter fönstret */
+    before: number;
+    after: number;
+};
+
+// Used until the scroll container has been measured
+const FALLBACK_VIEWPORT_HEIGHT = 1000;
+
+/**
+ * Vilka rader i en lista med lika höga rader som syns i scrollbehållaren,
+ * plus overscan rader på varje sida.
+ * @param count antal rader
+ * @param rowHeight radhöjd i pixlar
+ * @param scrollTop 
+ * @param viewportHeight behållarens höjd
+ * @param overscan 
+ * @returns 
+ */
+export function getVisibleRange(
+    count: number,
+    rowHeight: number,
+    scrollTop: number,
+    viewportHeight: number,
+    overscan: number = 8
+): VisibleRange {
+    if (count === 0 || rowHeight <= 0) return { start: 0, end: count, before: 0, after: 0 };
+
+    const height = viewportHeight > 0 ? viewportHeight : FALLBACK_VIEWPORT_HEIGHT;
+    const maxScroll = Math.max(0, count * rowHeight - height);
+    const top = Math.min(Math.max(0, scrollTop), maxScroll);
+
+    const start = Math.max(0, Math.floor(top / rowHeight) - overscan);
+    const end = Math.min(count, Math.ceil((top + height) / rowHeight) + overscan);
+
+    return { start, end, before: start * rowHeight, after: (count - end) * rowHeight };
+}
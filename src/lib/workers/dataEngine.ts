@@ -0,0 +1,141 @@
+import type { Keyword, Note } from '$lib/models';
+import type { KeywordDelta } from '$lib/utils/keywordIndex';
+import {
+    createEngineState,
+    handleRequest,
+    type EngineRequest,
+    type EngineResponse,
+    type EngineState,
+    type FilterQuery,
+    type FilterResult,
+} from './engine';
+
+type Pending = {
+    request: EngineRequest;
+    resolve: (response: EngineResponse) => void;
+    reject: (error: Error) => void;
+};
+
+export type DataEngine = {
+    /** Skickar de ändringar i notes och keywords som motorn inte har sett än. false om det inte fanns några */
+    update(notes: Note[], keywords: Keyword[]): boolean;
+    /** Filtrerar de senast skickade anteckningarna. Positionerna i svaret gäller den listan */
+    filter(query: FilterQuery): Promise<FilterResult>;
+};
+
+/** [position, CaseData] för anteckningar som bara fått nytt innehåll, null om listan har bytts ut */
+function diffNotes(previous: Note[], notes: Note[]): [number, string][] | null {
+    if (previous.length !== notes.length) return null;
+
+    const patches: [number, string][] = [];
+    for (let i = 0; i < notes.length; i++) {
+        const before = previous[i];
+        const note = notes[i];
+        if (before === note) continue;
+        if (before.CompositionId !== note.CompositionId || before.DateTime !== note.DateTime) return null;
+        if (before.CaseData !== note.CaseData) patches.push([i, note.CaseData]);
+    }
+    return patches;
+}
+
+/**
+ * Startar datamotorn i en Web Worker, så att parsning, indexering och
+ * filtrering inte blockerar huvudtråden. Om workers saknas, eller workern
+ * inte går att starta, körs samma kod i huvudtråden i stället.
+ * @param onKeywords anropas med ändringarna i sökordsindexet, en gång för varje synk som skickats
+ * @returns
+ */
+export function createDataEngine(onKeywords: (delta: KeywordDelta) => void): DataEngine {
+    let worker: Worker | null = null;
+    let local: EngineState | null = null;
+    let nextId = 0;
+    const pending = new Map<number, Pending>();
+
+    let syncedNotes: Note[] = [];
+    let syncedKeywords: Keyword[] = [];
+
+    function runLocally(request: EngineRequest): EngineResponse {
+        local ??= createEngineState();
+        return handleRequest(local, request).response;
+    }
+
+    function fallBack(reason: string) {
+        console.error('Data engine worker failed, filtering on the main thread:', reason);
+        worker?.terminate();
+        worker = null;
+
+        // The local engine starts empty, so give it everything before answering what was queued.
+        // Its keyword changes answer the first unanswered sync, later ones have nothing left to add
+        let delta = runLocally({ type: 'sync', notes: syncedNotes, keywords: syncedKeywords }) as KeywordDelta;
+        for (const { request, resolve } of pending.values()) {
+            if (request.type === 'sync') {
+                resolve(delta);
+                delta = { changed: [], removed: [] };
+            } else {
+                resolve(runLocally(request));
+            }
+        }
+        pending.clear();
+    }
+
+    if (typeof Worker !== 'undefined') {
+        try {
+            worker = new Worker(new URL('./dataEngine.worker.ts', import.meta.url), { type: 'module' });
+            worker.onmessage = (event: MessageEvent<{ id: number; response?: EngineResponse; error?: string }>) => {
+                const { id, response, error } = event.data;
+                const request = pending.get(id);
+                pending.delete(id);
+                if (!request) return;
+                if (error !== undefined) request.reject(new Error(error));
+                else request.resolve(response!);
+            };
+            worker.onerror = (event) => fallBack(event.message);
+        } catch {
+            worker = null;
+        }
+    }
+
+    function send(request: EngineRequest): Promise<EngineResponse> {
+        if (!worker) {
+            try {
+                return Promise.resolve(runLocally(request));
+            } catch (e: unknown) {
+                return Promise.reject(e);
+            }
+        }
+
+        const id = nextId++;
+        return new Promise((resolve, reject) => {
+            pending.set(id, { request, resolve, reject });
+            worker!.postMessage({ id, request });
+        });
+    }
+
+    return {
+        update(notes, keywords) {
+            if (notes === syncedNotes && keywords === syncedKeywords) return false;
+
+            const patches = diffNotes(syncedNotes, notes);
+            const request: EngineRequest = {
+                type: 'sync',
+                ...(patches === null ? { notes } : { patches }),
+                ...(keywords !== syncedKeywords ? { keywords } : {}),
+            };
+
+            syncedNotes = notes;
+            syncedKeywords = keywords;
+
+            send(request)
+                .then((delta) => onKeywords(delta as KeywordDelta))
+                .catch((e: unknown) => {
+                    console.error('Error indexing notes:', e instanceof Error ? e.message : String(e));
+                    onKeywords({ changed: [], removed: [] });
+                });
+            return true;
+        },
+
+        filter(query) {
+            return send({ type: 'filter', ...query }) as Promise<FilterResult>;
+        },
+    };
+}
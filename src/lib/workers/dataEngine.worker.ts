@@ -0,0 +1,15 @@
+import { createEngineState, handleRequest, type EngineRequest } from './engine';
+
+const state = createEngineState();
+
+// Requests are answered one at a time, in the order they were posted
+self.onmessage = (event: MessageEvent<{ id: number; request: EngineRequest }>) => {
+    const { id, request } = event.data;
+    try {
+        const { response, transfer } = handleRequest(state, request);
+        self.postMessage({ id, response }, { transfer });
+    } catch (e: unknown) {
+        const errorMessage = e instanceof Error ? e.message : String(e);
+        self.postMessage({ id, error: errorMessage });
+    }
+};
@@ -0,0 +1,192 @@
+import type { Keyword, Note } from '$lib/models';
+import {
+    buildFilterIndex,
+    createFacetCache,
+    filterWithCounts,
+    FACET_NAMES,
+    type FacetCache,
+    type FacetName,
+    type FilterIndex,
+} from '$lib/utils/filterEngine';
+import {
+    createKeywordIndex,
+    diffKeywordIndex,
+    getNotesWithAnyKeyword,
+    updateKeywordIndex,
+    type KeywordDelta,
+    type KeywordIndex,
+} from '$lib/utils/keywordIndex';
+import { createTextIndex, getHitSnippet, searchTextIndex, tokenize, updateTextIndex, type TextIndex } from '$lib/utils/textIndex';
+import { forEachBit } from '$lib/utils/bitset';
+
+// Only the best full-text hits are listed with a snippet, all of them are used for filtering
+const LISTED_HITS = 50;
+
+/** Filterval som de skickas till motorn. Allt är arrayer och strängar så att det kan klonas */
+export type FilterQuery = {
+    facets: [FacetName, string[]][];
+    minDate: string;
+    maxDate: string;
+    /** Valda sökord, anteckningen behöver ha minst ett av dem */
+    keywords: string[];
+    /** Fritextsökning, tom sträng = ingen */
+    text: string;
+};
+
+export type FilterResult = {
+    /** Positioner (i de synkade anteckningarna) som matchar, i samma ordning som anteckningarna */
+    positions: Int32Array;
+    /** Filter -> [värde, antal] för alla värden, i samma ordning som i indexet */
+    counts: [FacetName, [string, number][]][];
+    /** Positioner för fritextträffarna, bäst först. null när ingen fritextsökning är aktiv */
+    hits: Int32Array | null;
+    /** Utdrag runt träffen för de första hits, högst LISTED_HITS stycken. null som hits */
+    snippets: string[] | null;
+};
+
+export type EngineRequest =
+    | {
+          type: 'sync';
+          /** Alla anteckningar, när listan har bytts ut */
+          notes?: Note[];
+          /** [position, CaseData] för anteckningar vars innehåll har hämtats */
+          patches?: [number, string][];
+          keywords?: Keyword[];
+      }
+    | ({ type: 'filter' } & FilterQuery);
+
+export type EngineResponse = KeywordDelta | FilterResult;
+
+export type EngineState = {
+    notes: Note[];
+    keywords: Keyword[];
+    filterIndex: FilterIndex;
+    keywordIndex: KeywordIndex;
+    textIndex: TextIndex;
+    facetCache: FacetCache;
+    /** Räknas upp vid varje synk, så att cachade resultat som bygger på äldre data kan kännas igen */
+    version: number;
+    /** Senaste filterval, så att oförändrade val behåller samma Set och cachen i filterWithCounts träffar */
+    selections: Map<FacetName, Set<string>>;
+    /** Senaste begränsningen från sökord och fritext, och vad den byggde på */
+    constraint: { inputs: unknown[]; ids: Set<string> | null; hits: string[] | null; snippets: string[] | null };
+};
+
+export function createEngineState(): EngineState {
+    return {
+        notes: [],
+        keywords: [],
+        filterIndex: buildFilterIndex([]),
+        keywordIndex: createKeywordIndex(),
+        textIndex: createTextIndex(),
+        facetCache: createFacetCache(),
+        version: 0,
+        selections: new Map(),
+        constraint: { inputs: [], ids: null, hits: null, snippets: null },
+    };
+}
+
+function sync(state: EngineState, request: Extract<EngineRequest, { type: 'sync' }>): KeywordDelta {
+    if (request.notes) {
+        state.notes = request.notes;
+    }
+    if (request.patches && request.patches.length > 0) {
+        // Copies, since the fallback shares its note objects with the UI
+        state.notes = state.notes.slice();
+        for (const [position, caseData] of request.patches) {
+            state.notes[position] = { ...state.notes[position], CaseData: caseData };
+        }
+    }
+    if (request.keywords) {
+        state.keywords = request.keywords;
+    }
+
+    state.version++;
+    state.filterIndex = buildFilterIndex(state.notes, state.filterIndex);
+    updateTextIndex(state.textIndex, state.notes);
+
+    const before = new Map(state.keywordIndex.byNote);
+    updateKeywordIndex(state.keywordIndex, state.notes, state.keywords);
+    return diffKeywordIndex(before, state.keywordIndex);
+}
+
+function sameValues(set: Set<string> | undefined, values: string[]): boolean {
+    return set !== undefined && set.size === values.length && values.every((value) => set.has(value));
+}
+
+/**
+ * CompositionId som både har något av sökorden och matchar fritexten, null
+ * om ingen av dem är aktiv. Fritextträffarna och deras utdrag följer med.
+ */
+function constrain(state: EngineState, keywords: string[], text: string) {
+    const query = text.trim();
+    const inputs = [state.version, keywords.join('\n'), query];
+    const { constraint } = state;
+    if (constraint.inputs.length === inputs.length && constraint.inputs.every((value, i) => value === inputs[i])) {
+        return constraint;
+    }
+
+    // A query without words, e.g. only punctuation, is no text constraint rather than one nothing matches
+    const hits = tokenize(query).length === 0 ? null : searchTextIndex(state.textIndex, query).map((hit) => hit.compositionId);
+    let ids = keywords.length === 0 ? null : getNotesWithAnyKeyword(state.keywordIndex, keywords);
+    if (hits) {
+        ids = ids === null ? new Set(hits) : new Set(hits.filter((id) => ids!.has(id)));
+    }
+
+    // Snippets are cut here with the hits, so typing in the search field costs the UI nothing
+    const snippets = hits && hits.slice(0, LISTED_HITS).map((id) => {
+        const note = state.notes[state.filterIndex.positions.get(id) ?? -1];
+        return note ? getHitSnippet(note.CaseData, query) : '';
+    });
+
+    state.constraint = { inputs, ids, hits, snippets };
+    return state.constraint;
+}
+
+function filter(state: EngineState, query: FilterQuery): FilterResult {
+    const index = state.filterIndex;
+    const selected = new Map(query.facets);
+
+    for (const name of FACET_NAMES) {
+        const values = selected.get(name) ?? [];
+        if (!sameValues(state.selections.get(name), values)) {
+            state.selections.set(name, new Set(values));
+        }
+    }
+
+    const { ids, hits, snippets } = constrain(state, query.keywords, query.text);
+    const { matches, counts } = filterWithCounts(index, {
+        facets: state.selections,
+        minDate: query.minDate,
+        maxDate: query.maxDate,
+        compositionIds: ids,
+    }, state.facetCache);
+
+    const positions: number[] = [];
+    forEachBit(matches, (position) => positions.push(position));
+
+    return {
+        positions: Int32Array.from(positions),
+        counts: FACET_NAMES.map((name): [FacetName, [string, number][]] => [name, Array.from(counts.get(name) ?? [])]),
+        hits: hits && Int32Array.from(hits, (id) => index.positions.get(id) ?? -1),
+        snippets,
+    };
+}
+
+/**
+ * Kör en förfrågan mot motorns data. Används både i workern och i
+ * huvudtråden när workers inte finns.
+ * @param state
+ * @param request
+ * @returns svaret och de buffertar som kan flyttas till mottagaren i stället för att kopieras
+ */
+export function handleRequest(state: EngineState, request: EngineRequest): { response: EngineResponse; transfer: ArrayBuffer[] } {
+    if (request.type === 'sync') {
+        return { response: sync(state, request), transfer: [] };
+    }
+
+    const result = filter(state, request);
+    const transfer = [result.positions.buffer as ArrayBuffer];
+    if (result.hits) transfer.push(result.hits.buffer as ArrayBuffer);
+    return { response: result, transfer };
+}
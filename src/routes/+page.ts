@@ -1,27 +1,167 @@
-import { allNotes, allKeywords, CaseNoteFilter } from '$lib/stores';
+import { env } from '$env/dynamic/public';
+import { get } from 'svelte/store';
+import {
+  allNotes,
+  allKeywords,
+  CaseNoteFilter,
+  applyNoteDetails,
+  currentEhrId,
+  endStreamedDetails,
+  expectStreamedDetails,
+  setReady,
+} from '$lib/stores';
+import type { Keyword, Note, NoteStreamChunk } from '$lib/models';
+import type { NoteDetail } from '$lib/stores/caseData';
+import {
+  cachedUntil,
+  loadCachedJournal,
+  mergeCachedNotes,
+  persistJournal,
+  type CachedJournal,
+} from '$lib/stores/noteCache';
+import { DEFAULT_EHR_ID, readNdjson } from '$lib/utils';
 
-export async function load({ fetch }) {
+// The page streams its data from /api, which only pays off when load runs in the browser
+export const ssr = false;
+
+const NDJSON = 'application/x-ndjson';
+
+// 'lazy' loads metadata only and fetches each note body when it is opened
+const lazyCaseData = env.PUBLIC_NOTE_LOADING === 'lazy';
+
+async function applyRemainingChunks(batches: AsyncGenerator<NoteStreamChunk[]>) {
   try {
-    const res = await fetch('/api');
-
-    if (!res.ok) {
-      const errorMessages: Record<number, string> = {
-        400: 'Bad Request: The requested view does not exist.',
-        401: 'Unauthorized: Could not authenticate the user.',
-        403: 'Forbidden: You do not have the required permissions.',
-        408: 'Request Timeout: View processing took too long and was canceled.',
-      };
-
-      const errorMessage = errorMessages[res.status] || `Error: ${res.status} - ${res.statusText}`;
-      throw new Error(errorMessage);
+    for await (const batch of batches) {
+      const details = new Map<string, NoteDetail>();
+      const skipped = new Set<string>();
+
+      for (const chunk of batch) {
+        if (chunk.type === 'note') {
+          const { type, ...detail } = chunk;
+          details.set(detail.CompositionId, detail);
+        } else if (chunk.type === 'skip') {
+          skipped.add(chunk.CompositionId);
+        } else if (chunk.type === 'error') {
+          console.error('Error loading data:', chunk.error);
+        }
+      }
+
+      applyNoteDetails(details, skipped);
     }
+  } catch (e: unknown) {
+    const errorMessage = e instanceof Error ? e.message : String(e);
+    console.error('Error loading data:', errorMessage);
+  } finally {
+    endStreamedDetails();
+  }
+}
+
+/**
+ * Fyller allNotes, allKeywords och CaseNoteFilter med en journal. CaseData
+ * som den sparade journalen redan har behålls, och därefter sparas
+ * ändringar tillbaka till cachen.
+ */
+function applyJournal(ehrId: string, notes: Note[], keywords: Keyword[], caseNoteFilter: any[], cached: CachedJournal | null) {
+  currentEhrId.set(ehrId);
+  allNotes.set(mergeCachedNotes(notes, cached));
+  allKeywords.set(keywords);
+  CaseNoteFilter.set(caseNoteFilter);
+  persistJournal(ehrId, cached?.ehrId === ehrId ? cached.notes : []);
+}
+
+/**
+ * Väntar på listan och läser in den. Resten av strömmen läses in i
+ * bakgrunden.
+ */
+async function loadFromStream(body: ReadableStream<Uint8Array>, cached: CachedJournal | null) {
+  const batches = readNdjson<NoteStreamChunk>(body);
+
+  const first = await batches.next();
+  const [list, ...rest] = first.done ? [] : first.value;
+
+  if (!list || list.type !== 'list') {
+    throw new Error(list?.type === 'error' ? list.error : 'Error: Unexpected response from /api');
+  }
+
+  applyJournal(list.ehrId, list.notes, list.keywords, list.caseNoteFilter, cached);
+
+  // Bodies still missing are on their way in the stream, opening a note must not fetch them again
+  expectStreamedDetails(
+    get(allNotes)
+      .filter((note) => note.CompositionId && note.CaseData === '')
+      .map((note) => note.CompositionId)
+  );
 
-    const { notes = [], keywords = [], caseNoteFilter = [] } = await res.json();
+  async function* remaining() {
+    if (rest.length > 0) yield rest;
+    yield* batches;
+  }
+
+  applyRemainingChunks(remaining());
+}
+
+/**
+ * Hämtar journalen från /api. Finns en sparad journal skickas bara CaseData
+ * för anteckningar som sparats efter den, resten tas från cachen.
+ */
+async function fetchJournal(fetch: typeof globalThis.fetch, ehrId: string | null, cached: CachedJournal | null) {
+  // The patient is picked with ?ehrId=... on the page, otherwise the server uses its default
+  const params = new URLSearchParams();
+  if (ehrId) params.set('ehrId', ehrId);
+  if (lazyCaseData) params.set('details', 'none');
+
+  const since = cached && !lazyCaseData ? cachedUntil(cached) : undefined;
+  if (since) params.set('since', since);
+
+  const query = params.toString();
+  const apiUrl = query ? `/api?${query}` : '/api';
+  const res = lazyCaseData
+    ? await fetch(apiUrl)
+    : await fetch(apiUrl, { headers: { Accept: NDJSON } });
+
+  if (!res.ok) {
+    const errorMessages: Record<number, string> = {
+      400: 'Bad Request: The requested view does not exist.',
+      401: 'Unauthorized: Could not authenticate the user.',
+      403: 'Forbidden: You do not have the required permissions.',
+      408: 'Request Timeout: View processing took too long and was canceled.',
+    };
+
+    const errorMessage = errorMessages[res.status] || `Error: ${res.status} - ${res.statusText}`;
+    throw new Error(errorMessage);
+  }
 
-    allNotes.set(notes);
-    allKeywords.set(keywords);
-    CaseNoteFilter.set(caseNoteFilter);
+  if (res.body && res.headers.get('content-type')?.includes(NDJSON)) {
+    await loadFromStream(res.body, cached);
+    return;
+  }
+
+  const { ehrId: loadedEhrId = '', notes = [], keywords = [], caseNoteFilter = [] } = await res.json();
+  applyJournal(loadedEhrId, notes, keywords, caseNoteFilter, cached);
+}
+
+export async function load({ fetch, url }) {
+  const ehrId = url.searchParams.get('ehrId');
+  const cached = await loadCachedJournal(ehrId ?? DEFAULT_EHR_ID);
+
+  // A returning user sees the cached journal at once while the new notes are fetched
+  if (cached) {
+    currentEhrId.set(cached.ehrId);
+    allNotes.set(cached.notes);
+    allKeywords.set(cached.keywords);
+    CaseNoteFilter.set(cached.caseNoteFilter);
+    setReady('data', true);
 
+    fetchJournal(fetch, ehrId, cached).catch((e: unknown) => {
+      const errorMessage = e instanceof Error ? e.message : String(e);
+      console.error('Error updating cached journal:', errorMessage);
+    });
+    return {};
+  }
+
+  try {
+    await fetchJournal(fetch, ehrId, null);
+    setReady('data', true);
     return {};
   } catch (e: unknown) {
     const errorMessage = e instanceof Error ? e.message : String(e);
@@ -31,7 +171,8 @@ export async function load({ fetch }) {
     allNotes.set([]);
     allKeywords.set([]);
     CaseNoteFilter.set([]);
+    setReady('data', true);
 
     return { error: errorMessage };
   }
-}
\ No newline at end of file
+}
@@ -1,40 +1,97 @@
-import { json } from '@sveltejs/kit';
-import * as dotenv from 'dotenv';
-dotenv.config();
+import { json, type RequestEvent } from '@sveltejs/kit';
+import type { NoteStreamChunk } from '$lib/models';
+import { DEFAULT_EHR_ID, isValidEhrId } from '$lib/utils/ehrId';
+import {
+  DETAIL_CONCURRENCY,
+  fetchCaseNoteDetail,
+  fetchView,
+  getAuthHeader,
+  mapWithConcurrency,
+  savedAfter,
+  toListNote,
+} from '$lib/server/ehrApi';
+
+const NDJSON = 'application/x-ndjson';
+
+/**
+ * Skickar listan och sökorden direkt och därefter CaseData för
+ * anteckningarna i detailed, i den ordning de blir klara.
+ */
+function streamNotes(
+  ehrId: string,
+  notes: any[],
+  keywords: any[],
+  caseNoteFilter: any[],
+  authHeader: string,
+  detailed: (note: any) => boolean
+): Response {
+  const encoder = new TextEncoder();
+
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      const send = (chunk: NoteStreamChunk) =>
+        controller.enqueue(encoder.encode(JSON.stringify(chunk) + '\n'));
+
+      send({ type: 'list', ehrId, notes: notes.map((note) => toListNote(ehrId, note)), keywords, caseNoteFilter });
 
-const BASE_URL = 'https://open-platform-migration.service.tietoevry.com/ehr/rest/v1/view/';
-
-const createBasicAuth = (username: string, password: string): string =>
-  'Basic ' + btoa(`${username}:${password}`);
-
-const getCaseNoteListUrl = (ehrId: string): string =>
-  `${BASE_URL}${ehrId}/RSK.View.CaseNoteList`;
-
-const getCaseNoteDetailUrl = (ehrId: string, compositionId: string): string =>
-  `${BASE_URL}${ehrId}/RSK.View.CaseNote?compId=${compositionId}`;
-
-const getKeywordsUrl = (ehrId: string): string =>
-  `${BASE_URL}${ehrId}/RSK.View.Keywords`;
-
-const getCaseNoteFilterUrl = (ehrId: string): string =>
-  `${BASE_URL}${ehrId}/RSK.View.CaseNoteFilter`;
+      try {
+        await mapWithConcurrency(
+          notes.filter((note) => note.CompositionId && detailed(note)),
+          DETAIL_CONCURRENCY,
+          async (note) => {
+            const enriched = await fetchCaseNoteDetail(ehrId, note, authHeader);
+            if (enriched === null) {
+              send({ type: 'skip', CompositionId: note.CompositionId });
+            } else {
+              const { CompositionId, CaseData, error, errorStatus } = enriched;
+              send({ type: 'note', CompositionId, CaseData, ...(error ? { error, errorStatus } : {}) });
+            }
+          }
+        );
+        send({ type: 'done' });
+      } catch (e) {
+        const errorMessage = e instanceof Error ? e.message : String(e);
+        send({ type: 'error', error: `Network error: ${errorMessage}` });
+      }
 
-const styleError = 'color: red; font-style: italic;';
-const styleNotFound = 'text-indent:10px; margin-bottom:10px;';
+      controller.close();
+    },
+  });
+
+  return new Response(stream, {
+    headers: { 'Content-Type': NDJSON, 'Cache-Control': 'no-store' },
+  });
+}
+
+/**
+ * GET /api?ehrId=...
+ * Accept: application/x-ndjson ger ett strömmat svar, ?details=none ger bara
+ * metadata (CaseData hämtas då via /api/note/[compositionId]). Med ?since=...
+ * skickas hela listan men CaseData bara för anteckningar som sparats efter
+ * den tiden, resten har klienten redan. Utan ehrId används standardpatienten.
+ */
+export async function GET({ request, url }: RequestEvent) {
+  const ehrId = url.searchParams.get('ehrId') ?? DEFAULT_EHR_ID;
+  if (!isValidEhrId(ehrId)) {
+    return json({ ehrId, error: `Invalid ehrId: ${ehrId}` }, { status: 400 });
+  }
 
-const ehrId = "2b8d6cc8-0e30-439f-aeaa-0b0edfa09127";
+  const authHeader = getAuthHeader();
+  const streaming = request.headers.get('accept')?.includes(NDJSON) ?? false;
+  const withDetails = url.searchParams.get('details') !== 'none';
 
-export async function GET() {
-  const authHeader = createBasicAuth(process.env.API_USER as string, process.env.API_PASS as string);
-  const caseNoteListUrl = getCaseNoteListUrl(ehrId);
-  const keywordsUrl = getKeywordsUrl(ehrId);
-  const caseNoteFilterUrl = getCaseNoteFilterUrl(ehrId);
+  const sinceParam = url.searchParams.get('since');
+  const since = sinceParam === null ? null : Date.parse(sinceParam);
+  if (since !== null && Number.isNaN(since)) {
+    return json({ ehrId, error: `Invalid since: ${sinceParam}` }, { status: 400 });
+  }
+  const detailed = (note: any) => withDetails && (since === null || savedAfter(note, since));
 
   try {
     const [notesRes, keywordsRes, filterRes] = await Promise.all([
-      fetch(caseNoteListUrl, { method: 'GET', headers: { Authorization: authHeader } }),
-      fetch(keywordsUrl, { method: 'GET', headers: { Authorization: authHeader } }),
-      fetch(caseNoteFilterUrl, { method: 'GET', headers: { Authorization: authHeader } }),
+      fetchView(ehrId, 'RSK.View.CaseNoteList', authHeader),
+      fetchView(ehrId, 'RSK.View.Keywords', authHeader),
+      fetchView(ehrId, 'RSK.View.CaseNoteFilter', authHeader),
     ]);
 
     if (!notesRes.ok) {
@@ -45,61 +102,19 @@ export async function GET() {
     const keywords = keywordsRes.ok ? await keywordsRes.json() : [];
     const caseNoteFilter = filterRes.ok ? await filterRes.json() : [];
 
-    const enrichedNotes: any[] = [];
-
-    for (const note of notes) {
-      const compositionId = note.CompositionId;
-
-      if (!compositionId) {
-        enrichedNotes.push({
-          ...note,
-          CaseData: `<div style="${styleError}">Missing compositionId for EHR ID: ${ehrId}</div>`,
-          error: 'Missing compositionId',
-        });
-        continue;
-      }
-
-      const detailUrl = getCaseNoteDetailUrl(ehrId, compositionId);
-
-      try {
-        const detailRes = await fetch(detailUrl, {
-          method: 'GET',
-          headers: { Authorization: authHeader },
-        });
-
-        if (!detailRes.ok) {
-          if (detailRes.status === 500) {
-            // Skip this note entirely on server error
-            continue;
-          }
-
-          const errorText = `Failed to fetch detail for Composition ID: ${compositionId} - ${detailRes.status} ${detailRes.statusText}`;
-          enrichedNotes.push({
-            ...note,
-            CaseData: `<div style="${styleError}">${errorText}</div>`,
-            error: errorText,
-          });
-          continue;
-        }
-
-        const detailData = await detailRes.json();
-        const caseData = detailData[0]?.CaseData ?? `<div style="${styleNotFound}">Case data not found</div>`;
-        enrichedNotes.push({ ...note, CaseData: caseData });
-
-      } catch (e) {
-        const errorMessage = e instanceof Error ? e.message : String(e);
-        const errorText = `Error fetching detail for Composition ID: ${compositionId} - ${errorMessage}`;
-        enrichedNotes.push({
-          ...note,
-          CaseData: `<div style="${styleError}">${errorText}</div>`,
-          error: errorText,
-        });
-      }
+    if (streaming) {
+      return streamNotes(ehrId, notes, keywords, caseNoteFilter, authHeader, detailed);
     }
 
+    const enrichedNotes = (
+      await mapWithConcurrency(notes, DETAIL_CONCURRENCY, async (note: any) =>
+        detailed(note) ? fetchCaseNoteDetail(ehrId, note, authHeader) : toListNote(ehrId, note)
+      )
+    ).filter((note) => note !== null);
+
     return json({ ehrId, notes: enrichedNotes, keywords, caseNoteFilter });
   } catch (e) {
     const errorMessage = e instanceof Error ? e.message : String(e);
     return json({ ehrId, error: `Network error: ${errorMessage}` }, { status: 500 });
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,10 @@
+import { json } from '@sveltejs/kit';
+import { getViewCacheStats } from '$lib/server/viewCache';
+
+/**
+ * GET /api/cache
+ * Träffar, missar och minnesanvändning för cachen av EHR-vyer.
+ */
+export function GET() {
+  return json(getViewCacheStats());
+}
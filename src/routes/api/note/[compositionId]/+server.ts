@@ -0,0 +1,27 @@
+import { json, type RequestEvent } from '@sveltejs/kit';
+import { fetchCaseNoteDetail, getAuthHeader } from '$lib/server/ehrApi';
+import { DEFAULT_EHR_ID, isValidCompositionId, isValidEhrId } from '$lib/utils/ehrId';
+
+/**
+ * GET /api/note/[compositionId]?ehrId=...
+ * Hämtar CaseData för en enskild anteckning.
+ */
+export async function GET({ params, url }: RequestEvent) {
+  const compositionId = params.compositionId as string;
+  const ehrId = url.searchParams.get('ehrId') ?? DEFAULT_EHR_ID;
+  if (!isValidEhrId(ehrId)) {
+    return json({ ehrId, CompositionId: compositionId, error: `Invalid ehrId: ${ehrId}` }, { status: 400 });
+  }
+  if (!isValidCompositionId(compositionId)) {
+    return json({ ehrId, CompositionId: compositionId, error: `Invalid compositionId: ${compositionId}` }, { status: 400 });
+  }
+
+  const note = await fetchCaseNoteDetail(ehrId, { CompositionId: compositionId }, getAuthHeader());
+
+  if (note === null) {
+    return json({ ehrId, CompositionId: compositionId, error: 'Failed to fetch detail: 500' }, { status: 502 });
+  }
+
+  const { CaseData, error, errorStatus } = note;
+  return json({ ehrId, CompositionId: compositionId, CaseData, ...(error ? { error, errorStatus } : {}) });
+}
@@ -0,0 +1,348 @@
+"""Browser benchmarks for load, filtering, the timeline and search.
+
+Not collected by default, run them explicitly and without -n, since parallel
+workers skew each other's timings:
+
+    python3 -m pytest tests/bench_suite.py --bench-sizes 1000,10000
+
+Every measurement is timed inside the page with performance.now(), from the
+action until the UI shows its result and the next frame is drawn. The medians
+are written to --bench-output and compared with --bench-baseline.
+"""
+
+import json
+import os
+import statistics
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+import pytest
+from playwright.sync_api import Page, expect
+
+from journal_generator import HEADINGS
+
+LOAD_TIMEOUT = 180_000
+# The most common headings in a generated journal, so their notes are spread over the whole timeline
+BUBBLE_KEYWORDS = HEADINGS[:3]
+# Differences this small are noise, whatever the baseline
+NOISE_MS = 5.0
+
+# Installed before the app loads. Records when the list and the readiness signals
+# first appear, and gives the measurements a way to wait for the UI
+BENCH_SCRIPT = """
+(() => {
+    const marks = {};
+    window.__benchMarks = marks;
+
+    window.__benchReady = (signal) =>
+        (document.querySelector('main[data-ready]')?.dataset.ready ?? '').split(' ').includes(signal);
+
+    // Resolves with the time of the first frame after predicate holds, or null after timeout ms
+    window.__benchUntil = (predicate, timeout = 30000) => new Promise((resolve) => {
+        let finished = false;
+        const finish = (value) => {
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearTimeout(timer);
+            if (value === null) resolve(null);
+            else requestAnimationFrame(() => resolve(performance.now()));
+        };
+        const observer = new MutationObserver(() => { if (predicate()) finish(true); });
+        const timer = setTimeout(() => finish(null), timeout);
+        // Runs after the flush Svelte queued for the action
+        Promise.resolve().then(() => {
+            if (predicate()) finish(true);
+            else observer.observe(document, { childList: true, subtree: true, attributes: true, characterData: true });
+        });
+    });
+
+    const check = () => {
+        if (marks.listVisible === undefined &&
+            document.querySelector("[data-testid='filtered-list-view'] button.document-button")) {
+            marks.listVisible = performance.now();
+        }
+        if (marks.ready === undefined && ['data', 'filtered', 'keywords'].every(window.__benchReady)) {
+            marks.ready = performance.now();
+        }
+    };
+    new MutationObserver(check).observe(document, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['data-ready'],
+    });
+})();
+"""
+
+TOGGLE_FILTER = """async () => {
+    const button = document.querySelector('#template ul button');
+    const start = performance.now();
+    button.click();
+    const end = await window.__benchUntil(() => window.__benchReady('filtered'));
+    return end === null ? null : end - start;
+}"""
+
+TOGGLE_TIMELINE = """async (open) => {
+    const start = performance.now();
+    document.querySelector('#toggleTimeline').click();
+    const end = await window.__benchUntil(() => window.__benchReady('timeline') === open);
+    return end === null ? null : end - start;
+}"""
+
+# toggleAllYearGroups: a year button opens or closes every year, the month buttons grow or shrink
+TOGGLE_YEARS = """async () => {
+    const expanded = () => document.querySelector("[id^='toggle-month-']")?.classList.contains('h-6') ?? false;
+    const before = expanded();
+    const start = performance.now();
+    document.querySelector("[id^='toggle-year-']").click();
+    const end = await window.__benchUntil(() => expanded() !== before);
+    return end === null ? null : end - start;
+}"""
+
+# toggleAllMonthGroups: a month button opens or closes every month
+TOGGLE_MONTHS = """async () => {
+    const expanded = () => document.querySelector("[id^='toggle-month-']")?.classList.contains('cursor-zoom-out') ?? false;
+    const before = expanded();
+    const start = performance.now();
+    document.querySelector("[id^='toggle-month-']").click();
+    const end = await window.__benchUntil(() => expanded() !== before);
+    return end === null ? null : end - start;
+}"""
+
+# Scrolls the timeline and waits for the out-of-view keyword bubbles to change
+SCROLL_BUBBLES = """async (fraction) => {
+    const container = document.querySelector('#scroll-container');
+    const bubbles = () => ['left', 'right']
+        .map((side) => document.querySelector(`#out-of-view-keywords-${side}`)?.textContent ?? '')
+        .join('|');
+    const before = bubbles();
+    const start = performance.now();
+    container.scrollLeft = (container.scrollWidth - container.clientWidth) * fraction;
+    const end = await window.__benchUntil(() => bubbles() !== before, 3000);
+    return end === null ? null : end - start;
+}"""
+
+# Ctrl+F, type a word from the open note and wait for the <mark>s. Includes the search debounce
+SEARCH_HIGHLIGHT = """async (query) => {
+    const marks = () => document.querySelectorAll('#main-container mark').length;
+    const start = performance.now();
+    window.dispatchEvent(new KeyboardEvent('keydown', { key: 'f', ctrlKey: true, bubbles: true }));
+    await Promise.resolve();
+    const input = document.querySelector('#search-input input');
+    input.value = query;
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+    const end = await window.__benchUntil(() => marks() > 0);
+    input.value = '';
+    input.dispatchEvent(new Event('input', { bubbles: true }));
+    await window.__benchUntil(() => marks() === 0);
+    return end === null ? null : end - start;
+}"""
+
+# A word long enough to be specific, from the body of the first open note
+SEARCH_WORD = """() => {
+    const text = document.querySelector('#normal_note_matches_0')?.textContent ?? '';
+    return text.split(/[^\\p{L}]+/u).find((word) => word.length >= 6) ?? null;
+}"""
+
+
+class Outcome(NamedTuple):
+    """What recording one metric gave. At most one of the two is set."""
+
+    regression: Optional[str] = None
+    # Why nothing was recorded, when the UI never showed a result to time
+    missing: Optional[str] = None
+
+
+class BenchRecorder:
+    """Collects medians per benchmark and journal size, and compares them with the baseline."""
+
+    def __init__(self, config):
+        self.config = config
+        self.results = {}
+        self.summary = []
+        baseline_path = config.getoption("bench_baseline")
+        self.baseline = json.loads(baseline_path.read_text()).get("results", {}) if baseline_path.exists() else {}
+
+    def record(self, name: str, size: int, samples) -> Outcome:
+        """Stores the samples (ms) and compares the median with the baseline. Never fails or skips by itself,
+        so a test can record all its metrics before assert_no_regressions decides."""
+        samples = [sample for sample in samples if sample is not None]
+        if not samples:
+            return Outcome(missing=f"{name}: the UI never showed a result to time")
+
+        median = statistics.median(samples)
+        self.results.setdefault(name, {})[str(size)] = {
+            "median": round(median, 1),
+            "min": round(min(samples), 1),
+            "max": round(max(samples), 1),
+            "samples": [round(sample, 1) for sample in samples],
+        }
+        self.summary.append(f"{name} [{size} notes]: median {median:.1f} ms over {len(samples)} samples")
+
+        if self.config.getoption("bench_update_baseline"):
+            return Outcome()
+        baseline = self.baseline.get(name, {}).get(str(size))
+        if baseline is None:
+            return Outcome()
+        threshold = self.config.getoption("bench_threshold")
+        limit = baseline["median"] * (1 + threshold) + NOISE_MS
+        if median <= limit:
+            return Outcome()
+        return Outcome(regression=(
+            f"{name} regressed for {size} notes: median {median:.1f} ms, "
+            f"baseline {baseline['median']:.1f} ms, limit {limit:.1f} ms"
+        ))
+
+    def write(self):
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        output = self.config.getoption("bench_output")
+        if worker:
+            output = output.with_name(f"{output.stem}-{worker}{output.suffix}")
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "repeat": self.config.getoption("bench_repeat"),
+            "threshold": self.config.getoption("bench_threshold"),
+            "results": self.results,
+        }
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+        reporter = self.config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None and self.summary:
+            reporter.write_sep("-", f"benchmarks, written to {output}")
+            for line in self.summary:
+                reporter.write_line(line)
+
+        if self.config.getoption("bench_update_baseline") and self.results:
+            baseline_path = self.config.getoption("bench_baseline")
+            merged = {**self.baseline}
+            for name, sizes in self.results.items():
+                merged[name] = {**merged.get(name, {}), **sizes}
+            baseline_path.write_text(json.dumps({**report, "results": merged}, indent=2, ensure_ascii=False))
+
+
+def assert_no_regressions(*outcomes: Outcome):
+    """Fails on any regression. Otherwise skips when a metric had nothing to time."""
+    failed = [outcome.regression for outcome in outcomes if outcome.regression]
+    assert not failed, "\n".join(failed)
+    missing = [outcome.missing for outcome in outcomes if outcome.missing]
+    if missing:
+        pytest.skip("\n".join(missing))
+
+
+def pytest_generate_tests(metafunc):
+    if "synthetic_journal" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("bench_sizes").split(",") if size.strip()]
+        metafunc.parametrize("synthetic_journal", sizes, indirect=True, ids=[f"{size}-notes" for size in sizes])
+
+
+@pytest.fixture(scope="session")
+def bench(pytestconfig):
+    recorder = BenchRecorder(pytestconfig)
+    yield recorder
+    recorder.write()
+
+
+@pytest.fixture
+def repeat(pytestconfig) -> int:
+    return pytestconfig.getoption("bench_repeat")
+
+
+def open_journal(page: Page, base_url: str, journal_path):
+    page.add_init_script(BENCH_SCRIPT)
+    page.route("**/api", lambda route: route.fulfill(
+        status=200,
+        content_type="application/json",
+        path=journal_path
+    ))
+    page.goto(base_url)
+    page.wait_for_function("() => window.__benchMarks.listVisible !== undefined && window.__benchMarks.ready !== undefined",
+                           timeout=LOAD_TIMEOUT)
+
+
+@pytest.fixture
+def bench_page(page: Page, base_url, synthetic_journal) -> Page:
+    """The app with the generated journal loaded, filtered and indexed."""
+    open_journal(page, base_url, synthetic_journal.path)
+    return page
+
+
+def select_keywords(page: Page, names):
+    """Selects keywords in the Header dropdown and waits for the list to be filtered by them."""
+    page.locator("#keywords").hover()
+    for name in names:
+        page.locator(f"#dropdown_keywords button[name='{name}']").click()
+        page.wait_for_function("() => window.__benchReady('filtered')")
+
+
+def test_b1_load(browser, browser_context_args, base_url, synthetic_journal, bench, repeat):
+    """Test B1: Time from navigation until the list shows notes, and until everything is ready. Cold cache each time."""
+    list_visible, ready = [], []
+    for _ in range(repeat):
+        # A new context each time, so the journal is never read from IndexedDB
+        context = browser.new_context(**browser_context_args)
+        try:
+            page = context.new_page()
+            open_journal(page, base_url, synthetic_journal.path)
+            marks = page.evaluate("() => window.__benchMarks")
+            list_visible.append(marks["listVisible"])
+            ready.append(marks["ready"])
+        finally:
+            context.close()
+
+    size = synthetic_journal.spec.size
+    assert_no_regressions(
+        bench.record("time_to_list_visible", size, list_visible),
+        bench.record("time_to_ready", size, ready),
+    )
+
+
+def test_b2_filter_toggle(bench_page: Page, synthetic_journal, bench, repeat):
+    """Test B2: Latency from clicking a journal type in the Header until the list is filtered, on and off."""
+    samples = [bench_page.evaluate(TOGGLE_FILTER) for _ in range(2 * repeat)]
+    assert_no_regressions(bench.record("filter_toggle", synthetic_journal.spec.size, samples))
+
+
+def test_b3_timeline_open(bench_page: Page, synthetic_journal, bench, repeat):
+    """Test B3: Latency from switching the timeline on until it has laid out its notes."""
+    samples = []
+    for _ in range(repeat):
+        samples.append(bench_page.evaluate(TOGGLE_TIMELINE, True))
+        bench_page.evaluate(TOGGLE_TIMELINE, False)
+    assert_no_regressions(bench.record("timeline_open", synthetic_journal.spec.size, samples))
+
+
+def test_b4_timeline_zoom(bench_page: Page, synthetic_journal, bench, repeat):
+    """Test B4: Latency of opening and closing all years (toggleAllYearGroups) and months (toggleAllMonthGroups)."""
+    bench_page.evaluate(TOGGLE_TIMELINE, True)
+    size = synthetic_journal.spec.size
+
+    years = bench.record("timeline_zoom_years", size, [bench_page.evaluate(TOGGLE_YEARS) for _ in range(2 * repeat)])
+
+    # Months only show once their year is open
+    bench_page.evaluate(TOGGLE_YEARS)
+    months = bench.record("timeline_zoom_months", size, [bench_page.evaluate(TOGGLE_MONTHS) for _ in range(2 * repeat)])
+    assert_no_regressions(years, months)
+
+
+def test_b5_keyword_bubbles_scroll(bench_page: Page, synthetic_journal, bench, repeat):
+    """Test B5: Latency from scrolling the timeline until the out-of-view keyword bubbles are updated."""
+    # Bubbles are only shown for selected keywords
+    select_keywords(bench_page, BUBBLE_KEYWORDS)
+    bench_page.evaluate(TOGGLE_TIMELINE, True)
+    # Without bubbles every sample would time out, so a broken setup fails here instead of skipping
+    expect(bench_page.locator("[id^='keyword-bubble-']").first).to_be_attached()
+    samples = []
+    for _ in range(repeat):
+        samples.append(bench_page.evaluate(SCROLL_BUBBLES, 0.5))
+        samples.append(bench_page.evaluate(SCROLL_BUBBLES, 0))
+    assert_no_regressions(bench.record("keyword_bubbles_scroll", synthetic_journal.spec.size, samples))
+
+
+def test_b6_search_highlight(bench_page: Page, synthetic_journal, bench, repeat):
+    """Test B6: Latency from Ctrl+F and a query until the open note is highlighted, including the search debounce."""
+    bench_page.locator("[data-testid='filtered-list-view'] button.document-button").first.click()
+    expect(bench_page.locator("#normal_note_matches_0")).not_to_be_empty()
+    query = bench_page.evaluate(SEARCH_WORD)
+    if query is None:
+        pytest.skip("The open note has no word to search for")
+
+    samples = [bench_page.evaluate(SEARCH_HIGHLIGHT, query) for _ in range(repeat)]
+    assert_no_regressions(bench.record("search_highlight", synthetic_journal.spec.size, samples))
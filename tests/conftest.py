@@ -0,0 +1,205 @@
+import os
+import shutil
+import socket
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from journal_generator import SIZES, JournalFile, JournalSpec, write_journal
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BUILD_DIR = PROJECT_ROOT / "build"
+SERVER_START_TIMEOUT = 30
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("app-server", "ClarityCare app servers")
+    group.addoption(
+        "--skip-build",
+        action="store_true",
+        default=False,
+        help="Use the existing build/ output instead of running 'npm run build' first.",
+    )
+    group.addoption(
+        "--reuse-page",
+        action="store_true",
+        default=False,
+        help="Load the app once per worker and reset it between tests instead of reloading it.",
+    )
+
+    bench = parser.getgroup("benchmarks", "Browser benchmarks (tests/bench_suite.py)")
+    bench.addoption("--bench-sizes", default="1000,10000", help="Comma-separated journal sizes to benchmark.")
+    bench.addoption("--bench-repeat", type=int, default=5, help="Samples per measurement, the median is compared.")
+    bench.addoption(
+        "--bench-baseline",
+        type=Path,
+        default=PROJECT_ROOT / "tests" / "bench_baseline.json",
+        help="Baseline results to compare against.",
+    )
+    bench.addoption(
+        "--bench-output",
+        type=Path,
+        default=PROJECT_ROOT / "bench_results.json",
+        help="Where to write this run's results.",
+    )
+    bench.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.25,
+        help="Fail when a median is this much slower than its baseline, 0.25 = 25 %%.",
+    )
+    bench.addoption(
+        "--bench-update-baseline",
+        action="store_true",
+        default=False,
+        help="Write this run's results into the baseline instead of comparing against it.",
+    )
+
+
+def is_xdist_worker(config) -> bool:
+    return hasattr(config, "workerinput")
+
+
+def uses_external_server(config) -> bool:
+    """True when --base-url points the tests at a server that is already running, e.g. 'npm run dev'."""
+    return bool(config.getoption("base_url", None))
+
+
+def pytest_sessionstart(session):
+    """Build the app once, in the controller, before any worker starts its server."""
+    config = session.config
+    if is_xdist_worker(config) or uses_external_server(config):
+        return
+    if config.getoption("skip_build"):
+        if not (BUILD_DIR / "index.js").exists():
+            pytest.exit("--skip-build was given but there is no build/index.js, run 'npm run build' first", returncode=1)
+        return
+
+    npm = shutil.which("npm")
+    if npm is None:
+        pytest.exit("npm was not found, it is needed to build the app for the tests", returncode=1)
+    result = subprocess.run([npm, "run", "build"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        pytest.exit(f"'npm run build' failed:\n{result.stdout}\n{result.stderr}", returncode=1)
+
+
+def free_port() -> int:
+    """Ask the OS for an unused port. Each worker gets its own, so servers never collide."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(url: str, process: subprocess.Popen, log_path: Path):
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App server exited with code {process.returncode}, see {log_path}:\n{log_path.read_text()}")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except urllib.error.HTTPError:
+            # Any HTTP answer means the server is listening
+            return
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.1)
+    raise RuntimeError(f"App server at {url} did not start within {SERVER_START_TIMEOUT} s, see {log_path}")
+
+
+@pytest.fixture(scope="session")
+def app_server(pytestconfig, tmp_path_factory):
+    """Start the built adapter-node app on an ephemeral port, one server per xdist worker."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    log_path = tmp_path_factory.mktemp(f"app-server-{worker}") / "server.log"
+
+    env = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "ORIGIN": url,
+        # Exposes window.stores, which the tests use to read and reset state
+        "PUBLIC_TEST_HOOKS": "true",
+    }
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(["node", "build"], cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_for_server(url, process, log_path)
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@pytest.fixture(scope="session")
+def base_url(pytestconfig, request):
+    """The app under test. --base-url uses a running server, otherwise each worker starts its own."""
+    external = pytestconfig.getoption("base_url", None)
+    if external:
+        return external.rstrip("/")
+    return request.getfixturevalue("app_server")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _verify_url(pytestconfig):
+    """Replaces the autouse check from pytest-base-url, which asks every test for base_url.
+
+    That would start an app server even for tests that never load the app. Now only tests that use page, context
+    or base_url start one, and the servers started here are already checked by wait_for_server.
+    """
+    external = pytestconfig.getoption("base_url", None)
+    if not external or not pytestconfig.getoption("verify_base_url", False):
+        return
+    try:
+        with urllib.request.urlopen(external, timeout=SERVER_START_TIMEOUT):
+            pass
+    except urllib.error.HTTPError:
+        # Any HTTP answer means the server is listening
+        pass
+    except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+        pytest.exit(f"Base URL {external} did not respond: {e}", returncode=1)
+
+
+@pytest.fixture(scope="session")
+def shared_page(browser, browser_context_args, base_url):
+    """One page per worker for --reuse-page. setup_page loads the app in it once and resets it before each test."""
+    context = browser.new_context(**browser_context_args)
+    page = context.new_page()
+    page.on("console", lambda msg: print(f"BROWSER CONSOLE: {msg.text}"))
+    yield page
+    context.close()
+
+
+@pytest.fixture(scope="session")
+def journal_files(tmp_path_factory):
+    """Writes each synthetic journal once per worker and hands out the same file after that."""
+    directory = tmp_path_factory.mktemp("journals")
+    written = {}
+
+    def get(spec: JournalSpec, ndjson: bool = False) -> JournalFile:
+        key = (spec, ndjson)
+        if key not in written:
+            suffix = "ndjson" if ndjson else "json"
+            written[key] = write_journal(spec, directory / f"journal-{len(written)}-{spec.size}.{suffix}", ndjson=ndjson)
+        return written[key]
+
+    return get
+
+
+@pytest.fixture
+def synthetic_journal(request, journal_files) -> JournalFile:
+    """A generated journal on disk. Parametrize indirectly with a size or a JournalSpec:
+
+        @pytest.mark.parametrize("synthetic_journal", [100, 10_000], indirect=True)
+    """
+    param = getattr(request, "param", SIZES[0])
+    spec = param if isinstance(param, JournalSpec) else JournalSpec(size=param)
+    return journal_files(spec)
@@ -0,0 +1,277 @@
+"""Deterministic synthetic journals in the /api schema.
+
+The same JournalSpec always gives the same journal, so tests and benchmarks
+can parametrize over sizes and compare runs. Notes are generated one at a
+time, newest first, and the writers stream them to disk, so a 100k-note
+journal is never held in memory.
+
+    python tests/journal_generator.py --size 10000 --seed 1 -o journal.json
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, TextIO, Tuple, TypeVar
+
+SIZES: Tuple[int, ...] = (100, 1_000, 10_000, 100_000)
+
+# (name, identifier, weight)
+CARE_UNITS: Sequence[Tuple[str, str, float]] = (
+    ("Vårdcentralen Centrum", "1001", 0.24),
+    ("Akutmottagningen", "1002", 0.16),
+    ("Medicinkliniken", "1003", 0.11),
+    ("Kardiologiska kliniken", "1004", 0.09),
+    ("Diabetesmottagningen", "1005", 0.08),
+    ("Ortopedkliniken", "1006", 0.08),
+    ("Rehabkliniken", "1007", 0.07),
+    ("Kärlkliniken", "1008", 0.05),
+    ("Operation", "1009", 0.05),
+    ("Psykiatriska mottagningen", "1010", 0.04),
+    ("Infektionskliniken", "1011", 0.03),
+)
+
+# (title, identifier, weight, [(document name, documentation code)])
+ROLES: Sequence[Tuple[str, str, float, Sequence[Tuple[str, str]]]] = (
+    ("Läkare", "1", 0.34, (
+        ("Läkaranteckning", "BES"),
+        ("Inskrivningsanteckning", "INS"),
+        ("Epikris", "EPI"),
+        ("Telefonanteckning läkare", "TEL"),
+        ("Konsultationssvar", "KON"),
+    )),
+    ("Sjuksköterska", "2", 0.32, (
+        ("Omvårdnadsanteckning", "OMV"),
+        ("Telefonanteckning sjuksköterska", "TEL"),
+        ("Omvårdnadsepikris", "OEP"),
+    )),
+    ("Undersköterska", "3", 0.10, (("Omvårdnadsanteckning", "OMV"),)),
+    ("Fysioterapeut", "4", 0.08, (("Fysioterapeutanteckning", "FYS"), ("Rehabanteckning", "REH"))),
+    ("Arbetsterapeut", "5", 0.05, (("Arbetsterapeutanteckning", "ATA"),)),
+    ("Diabetessköterska", "6", 0.05, (("Diabetesjournal", "DIA"),)),
+    ("Kurator", "7", 0.03, (("Kuratorsanteckning", "KUR"),)),
+    ("Dietist", "8", 0.03, (("Dietistanteckning", "DIE"),)),
+)
+
+# Keyword headings, most common first. Picked with Zipf-like weights
+HEADINGS: Sequence[str] = (
+    "Aktuellt", "Bedömning", "Status", "Åtgärd", "Anamnes", "Planering", "Läkemedel",
+    "Kontaktorsak", "Diagnos", "Provsvar", "Hjärta", "Lungor", "Buk", "Smärta",
+    "Information", "Uppföljning", "Nutrition", "Elimination", "Sömn", "Hud", "Sår",
+    "Social situation", "Psykiskt status", "Kärlkramp", "Diabetes", "Rehab", "Operation",
+)
+HEADING_WEIGHTS: Sequence[float] = tuple(1 / (rank + 1) for rank in range(len(HEADINGS)))
+
+WORDS: Sequence[str] = (
+    "patienten", "besöker", "mottagningen", "för", "uppföljning", "av", "sin", "tidigare",
+    "kända", "besvär", "och", "uppger", "att", "det", "har", "blivit", "bättre", "sedan",
+    "förra", "kontakten", "men", "fortfarande", "viss", "trötthet", "på", "kvällarna",
+    "inga", "nytillkomna", "symtom", "blodtryck", "puls", "temperatur", "normala",
+    "fortsätter", "med", "nuvarande", "behandling", "återbesök", "om", "tre", "månader",
+    "vid", "försämring", "kontakt", "tas", "informerad", "samtycker", "till", "planen",
+    "lätt", "ödem", "underben", "andning", "utan", "anmärkning", "smärta", "skattas",
+)
+
+EPOCH_END = datetime(2025, 3, 31, 16, 0, tzinfo=timezone.utc)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class JournalSpec:
+    """What to generate. Equal specs give identical journals."""
+    size: int
+    seed: int = 0
+    ehr_id: str = "synthetic-ehr"
+    # The newest note is written at end, the rest spread back over about this many years
+    years: float = 10.0
+    end: datetime = EPOCH_END
+
+    def __post_init__(self):
+        if self.size < 0:
+            raise ValueError(f"size must be >= 0, got {self.size}")
+
+
+@dataclass(frozen=True)
+class JournalFile:
+    """A journal written to disk, e.g. to be served with route.fulfill(path=...)."""
+    spec: JournalSpec
+    path: Path
+
+
+def cumulative(weights: Sequence[float]) -> List[float]:
+    return list(itertools.accumulate(weights))
+
+
+UNIT_CUM_WEIGHTS = cumulative([weight for _, _, weight in CARE_UNITS])
+ROLE_CUM_WEIGHTS = cumulative([weight for _, _, weight, _ in ROLES])
+HEADING_CUM_WEIGHTS = cumulative(HEADING_WEIGHTS)
+
+
+def pick(rng: random.Random, items: Sequence[T], cum_weights: Sequence[float]) -> T:
+    return rng.choices(items, cum_weights=cum_weights)[0]
+
+
+def pick_headings(rng: random.Random) -> List[str]:
+    """1-8 distinct headings, log-normal in number so most notes have a few and some many."""
+    sections = min(8, max(1, round(rng.lognormvariate(0.8, 0.6))))
+    headings: List[str] = []
+    while len(headings) < sections:
+        heading = pick(rng, HEADINGS, HEADING_CUM_WEIGHTS)
+        if heading not in headings:
+            headings.append(heading)
+    return headings
+
+
+def case_data(rng: random.Random, headings: Sequence[str]) -> str:
+    """A body with one paragraph per bold heading. Paragraph lengths are log-normal, so a few notes are very long."""
+    paragraphs = []
+    for heading in headings:
+        sentences = []
+        for _ in range(max(1, round(rng.lognormvariate(1.0, 0.7)))):
+            sentences.append(" ".join(rng.choices(WORDS, k=rng.randint(5, 16))).capitalize() + ".")
+        paragraphs.append(f"<p><b>{heading}</b><br>{' '.join(sentences)}</p>")
+    return "".join(paragraphs)
+
+
+def note_times(spec: JournalSpec) -> Iterator[datetime]:
+    """Newest first. Notes come in care episodes of a few close notes, with longer gaps between them."""
+    if spec.size == 0:
+        return
+    rng = random.Random(f"{spec.seed}:times")
+    span = timedelta(days=365.25 * spec.years).total_seconds()
+    mean_gap = span / spec.size
+    current = spec.end
+    for _ in range(spec.size):
+        yield current
+        if rng.random() < 0.35:
+            # Same episode: minutes to hours later
+            gap = rng.expovariate(1 / min(mean_gap, 6 * 3600))
+        else:
+            gap = rng.expovariate(1 / (mean_gap * 1.5))
+        current -= timedelta(seconds=max(60, gap))
+
+
+def generate_notes_with_headings(spec: JournalSpec, bodies: bool = True) -> Iterator[Tuple[Dict[str, str], List[str]]]:
+    """The notes of spec, newest first, one at a time, each with the bold headings in its body.
+
+    Each note has its own random stream, drawn body last, so bodies=False gives
+    the same notes with CaseData left empty, for much less work.
+    """
+    for index, time in enumerate(note_times(spec)):
+        rng = random.Random(f"{spec.seed}:{index}")
+        unit_name, unit_id, _ = pick(rng, CARE_UNITS, UNIT_CUM_WEIGHTS)
+        role_name, role_id, _, documents = pick(rng, ROLES, ROLE_CUM_WEIGHTS)
+        document_name, documentation_code = rng.choice(documents)
+        saved = time + timedelta(minutes=rng.randint(1, 240))
+        composition_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        headings = pick_headings(rng)
+
+        note = {
+            "CompositionId": composition_id,
+            "DateTime": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "DisplayDateTime": time.strftime("%Y-%m-%d %H:%M"),
+            "Dokument_ID": f"DOC{index + 1:06d}",
+            "Dokumentnamn": document_name,
+            "Dokument_skapad_av_yrkestitel_ID": role_id,
+            "Dokument_skapad_av_yrkestitel_Namn": role_name,
+            "Dokumentationskod": documentation_code,
+            "Tidsstämpel_för_sparat_dokument": saved.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "Vårdenhet_Identifierare": unit_id,
+            "Vårdenhet_Namn": unit_name,
+            "CaseData": case_data(rng, headings) if bodies else "",
+        }
+        yield note, headings
+
+
+def generate_notes(spec: JournalSpec, bodies: bool = True) -> Iterator[Dict[str, str]]:
+    """The notes of spec, newest first, one at a time. bodies=False leaves CaseData empty, as in the list view."""
+    for note, _ in generate_notes_with_headings(spec, bodies):
+        yield note
+
+
+def generate_keywords(spec: JournalSpec) -> Iterator[Dict[str, str]]:
+    """The keyword view for spec: one row per bold heading in each note, as RSK.View.Keywords has them."""
+    number = 0
+    for note, headings in generate_notes_with_headings(spec, bodies=False):
+        for heading in headings:
+            number += 1
+            yield {"Id": f"kw{number}", "Name": heading, "CompositionId": note["CompositionId"]}
+
+
+def generate_journal(spec: JournalSpec) -> Dict[str, object]:
+    """The whole /api response in memory. Fine for small journals, use the writers for large ones."""
+    return {
+        "ehrId": spec.ehr_id,
+        "notes": list(generate_notes(spec)),
+        "keywords": list(generate_keywords(spec)),
+        "caseNoteFilter": [],
+    }
+
+
+def dumps(value: object) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_json(spec: JournalSpec) -> Iterator[str]:
+    """The /api JSON response as text pieces. The keywords are generated again rather than kept from the notes."""
+    yield f'{{"ehrId":{dumps(spec.ehr_id)},"notes":['
+    for i, note in enumerate(generate_notes(spec)):
+        yield ("," if i else "") + dumps(note)
+    yield '],"keywords":['
+    for i, keyword in enumerate(generate_keywords(spec)):
+        yield ("," if i else "") + dumps(keyword)
+    yield '],"caseNoteFilter":[]}'
+
+
+def iter_ndjson(spec: JournalSpec) -> Iterator[str]:
+    """The streamed /api response (Accept: application/x-ndjson): the list without bodies, then one line per body."""
+    yield f'{{"type":"list","ehrId":{dumps(spec.ehr_id)},"notes":['
+    for i, note in enumerate(generate_notes(spec, bodies=False)):
+        yield ("," if i else "") + dumps(note)
+    yield '],"keywords":['
+    for i, keyword in enumerate(generate_keywords(spec)):
+        yield ("," if i else "") + dumps(keyword)
+    yield '],"caseNoteFilter":[]}\n'
+    for note in generate_notes(spec):
+        yield dumps({"type": "note", "CompositionId": note["CompositionId"], "CaseData": note["CaseData"]}) + "\n"
+    yield dumps({"type": "done"}) + "\n"
+
+
+def write(pieces: Iterator[str], out: TextIO):
+    for piece in pieces:
+        out.write(piece)
+
+
+def write_journal(spec: JournalSpec, path: Path, ndjson: bool = False) -> JournalFile:
+    """Stream the journal of spec to path as the JSON or NDJSON /api response."""
+    path = Path(path)
+    with path.open("w", encoding="utf-8") as out:
+        write(iter_ndjson(spec) if ndjson else iter_json(spec), out)
+    return JournalFile(spec, path)
+
+
+def main(argv: Sequence[str]) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic journal in the /api schema.")
+    parser.add_argument("--size", type=int, default=1_000, help=f"number of notes, e.g. one of {SIZES}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--years", type=float, default=10.0, help="about how many years the notes span")
+    parser.add_argument("--ndjson", action="store_true", help="write the streamed response instead of JSON")
+    parser.add_argument("-o", "--output", type=Path, help="file to write, stdout if left out")
+    args = parser.parse_args(argv)
+
+    spec = JournalSpec(size=args.size, seed=args.seed, years=args.years)
+    if args.output:
+        write_journal(spec, args.output, ndjson=args.ndjson)
+    else:
+        write(iter_ndjson(spec) if args.ndjson else iter_json(spec), sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))